@@ -1,13 +1,72 @@
 """Enhanced confidence scoring for auto-fix decisions."""
 
-from typing import Dict, Any
-
-
+import bisect
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, Mapping
+
+
+# Built once at import and returned by reference; read-only views so
+# callers cannot mutate shared state
+_RECOMMENDATION_DETAILS = MappingProxyType({
+    "CREATE_PR": MappingProxyType({
+        "action": "Create pull request",
+        "description": "High confidence - create regular PR for review",
+        "draft": False,
+        "min_confidence": 0.90,
+    }),
+    "CREATE_DRAFT_PR": MappingProxyType({
+        "action": "Create draft pull request",
+        "description": "Good confidence - create draft PR for careful review",
+        "draft": True,
+        "min_confidence": 0.75,
+    }),
+    "COMMENT_ONLY": MappingProxyType({
+        "action": "Add comment to issue",
+        "description": "Moderate confidence - suggest fix in comment only",
+        "draft": False,
+        "min_confidence": 0.50,
+    }),
+    "SKIP": MappingProxyType({
+        "action": "Skip fix",
+        "description": "Low confidence - do not apply fix",
+        "draft": False,
+        "min_confidence": 0.0,
+    }),
+})
+
+
+def _score_kernel(
+    ai_confidence: float,
+    model_multiplier: float,
+    test_boost: float,
+    pattern_boost: float,
+    complexity_penalty: float,
+) -> float:
+    """
+    Core scoring arithmetic, extracted as a free function.
+
+    The boosted score is clamped to 1.0 before the complexity penalty
+    is applied, matching the original step-by-step computation so the
+    kernel produces identical scores (and recommendations) for every
+    input.
+    """
+    value = min(ai_confidence * model_multiplier + test_boost + pattern_boost, 1.0)
+    value *= (1.0 - complexity_penalty)
+    return 0.0 if value < 0.0 else value
+
+
+@dataclass(frozen=True, slots=True)
 class ConfidenceScorer:
-    """Calculates confidence scores for fixes."""
+    """Calculates confidence scores for fixes.
+
+    Stateless and immutable: instances carry no per-instance dict, and
+    the scoring tables are read-only views shared by all instances.
+    """
 
     # Model-based multipliers (aligned with analyzer)
-    MODEL_MULTIPLIERS = {
+    MODEL_MULTIPLIERS = MappingProxyType({
         'gpt-4': 1.0,
         'gpt-4o': 1.0,
         'gpt-4o-mini': 0.85,
@@ -19,16 +78,30 @@ class ConfidenceScorer:
         'deepseek-coder': 0.75,
         'deepseek/deepseek-chat': 0.70,
         'deepseek/deepseek-coder': 0.75,
-    }
+    })
 
     # Pattern-based confidence boosts
-    PATTERN_BOOSTS = {
+    PATTERN_BOOSTS = MappingProxyType({
         "missing_await": 0.10,      # Very clear pattern
         "module_not_found": 0.10,   # Usually straightforward
         "type_mismatch": 0.08,      # Clear mismatch
         "selector_timeout": 0.05,   # More context-dependent
         "navigation_timeout": 0.05, # Could have multiple causes
-    }
+    })
+
+    # Frozen at class-definition time for O(1) exact-match lookups
+    _EXACT_KEYS = frozenset(MODEL_MULTIPLIERS)
+
+    # Substring fallback checks longest keys first so e.g. "gpt-4o-mini"
+    # never falls through to the shorter "gpt-4o" or "gpt-4" entries
+    _SORTED_KEYS = tuple(sorted(MODEL_MULTIPLIERS, key=len, reverse=True))
+
+    # Sorted threshold tables for bisect-based lookups (see
+    # _get_recommendation and _calculate_complexity_penalty)
+    _THRESHOLDS = (0.50, 0.75, 0.90)
+    _LABELS = ("SKIP", "COMMENT_ONLY", "CREATE_DRAFT_PR", "CREATE_PR")
+    _COMPLEX_EDGES = (5, 10)
+    _COMPLEX_PENALTIES = (0.0, 0.15, 0.30)
 
     def calculate_confidence(
         self,
@@ -65,23 +138,19 @@ class ConfidenceScorer:
         model_key = self._normalize_model_name(model)
         model_multiplier = self.MODEL_MULTIPLIERS.get(model_key, 0.60)
 
-        # Apply model multiplier to AI confidence
-        adjusted_confidence = ai_confidence * model_multiplier
-
         # Boost if test passed (significant indicator of success)
         test_boost = 0.15 if test_passed else 0.0
-        adjusted_confidence = min(adjusted_confidence + test_boost, 1.0)
 
         # Pattern-based boost (some patterns are easier to fix)
         pattern_boost = self._get_pattern_boost(pattern)
-        adjusted_confidence = min(adjusted_confidence + pattern_boost, 1.0)
 
         # Complexity penalty (complex fixes are riskier)
         complexity_penalty = self._calculate_complexity_penalty(fix_complexity)
-        adjusted_confidence *= (1.0 - complexity_penalty)
 
-        # Ensure final confidence is in valid range
-        adjusted_confidence = max(0.0, min(1.0, adjusted_confidence))
+        adjusted_confidence = _score_kernel(
+            ai_confidence, model_multiplier, test_boost,
+            pattern_boost, complexity_penalty,
+        )
 
         # Determine recommended action
         recommendation = self._get_recommendation(adjusted_confidence)
@@ -96,26 +165,99 @@ class ConfidenceScorer:
             "recommendation": recommendation,
         }
 
-    def _normalize_model_name(self, model: str) -> str:
+    def calculate_confidence_batch(self, items: list) -> list:
+        """
+        Score many fixes in one call.
+
+        Amortizes model/pattern lookups across the batch so scoring
+        hundreds of failures in a CI run avoids repeated per-call
+        normalization and dict probing.
+
+        Args:
+            items: List of dicts with the same keys as the
+                calculate_confidence arguments (ai_confidence,
+                test_passed, pattern, model, fix_complexity)
+
+        Returns:
+            List of result dicts, in input order, with the same shape as
+            calculate_confidence
+        """
+        # Hoist lookups shared across the batch: a CI run typically uses
+        # one model and a handful of patterns.
+        multipliers = self.MODEL_MULTIPLIERS
+        boosts = self.PATTERN_BOOSTS
+        mult_by_model = {}
+        results = []
+
+        for item in items:
+            model = item.get("model", "")
+            model_multiplier = mult_by_model.get(model)
+            if model_multiplier is None:
+                model_multiplier = multipliers.get(
+                    self._normalize_model_name(model), 0.60
+                )
+                mult_by_model[model] = model_multiplier
+
+            ai_confidence = max(0.0, min(1.0, float(item.get("ai_confidence", 0.0))))
+            test_boost = 0.15 if item.get("test_passed") else 0.0
+            pattern_boost = boosts.get(item.get("pattern", ""), 0.0)
+            complexity_penalty = self._calculate_complexity_penalty(
+                item.get("fix_complexity", 1)
+            )
+
+            adjusted = _score_kernel(
+                ai_confidence, model_multiplier, test_boost,
+                pattern_boost, complexity_penalty,
+            )
+
+            results.append({
+                "confidence": adjusted,
+                "raw_confidence": ai_confidence,
+                "model_multiplier": model_multiplier,
+                "test_boost": test_boost,
+                "pattern_boost": pattern_boost,
+                "complexity_penalty": complexity_penalty,
+                "recommendation": self._get_recommendation(adjusted),
+            })
+
+        return results
+
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _normalize_model_name(model: str) -> str:
         """
         Normalize model name for lookup.
 
+        Results are cached: the same handful of model strings get scored
+        over and over, so repeated lookups cost one hash.
+
         Args:
             model: Model name (may include provider prefix)
 
         Returns:
             Normalized model name
         """
+        # Callers overwhelmingly pass an already-canonical name like
+        # "gpt-4o-mini"; skip all string work for that case
+        if model in ConfidenceScorer._EXACT_KEYS:
+            return model
+
         model_lower = model.lower()
+        if model_lower in ConfidenceScorer._EXACT_KEYS:
+            return model_lower
 
         # Remove provider prefixes (openrouter/, anthropic/, etc.)
         if '/' in model_lower:
-            parts = model_lower.split('/')
-            model_lower = parts[-1]  # Take last part
+            model_lower = model_lower.rsplit('/', 1)[-1]  # Take last part
+
+        # Exact match after prefix stripping
+        if model_lower in ConfidenceScorer._EXACT_KEYS:
+            return model_lower
 
-        # Check for matches
-        for key in self.MODEL_MULTIPLIERS.keys():
-            if key in model_lower or model_lower in key:
+        # Substring fallback, longest key first (e.g. a dated release like
+        # "claude-3-5-sonnet-20240620" matches "claude-3-5-sonnet")
+        for key in ConfidenceScorer._SORTED_KEYS:
+            if key in model_lower:
                 return key
 
         # Unknown model - use conservative multiplier
@@ -145,14 +287,8 @@ class ConfidenceScorer:
         Returns:
             Penalty percentage (0.0-0.30)
         """
-        if lines_changed <= 1:
-            return 0.0  # No penalty for single-line fixes
-        elif lines_changed <= 5:
-            return 0.0  # Simple multi-line fixes
-        elif lines_changed <= 10:
-            return 0.15  # Moderate complexity
-        else:
-            return 0.30  # High complexity - significant penalty
+        # <=5 lines: no penalty, <=10: moderate, >10: high
+        return self._COMPLEX_PENALTIES[bisect.bisect_left(self._COMPLEX_EDGES, lines_changed)]
 
     def _get_recommendation(self, confidence: float) -> str:
         """
@@ -164,14 +300,31 @@ class ConfidenceScorer:
         Returns:
             One of: CREATE_PR, CREATE_DRAFT_PR, COMMENT_ONLY, SKIP
         """
-        if confidence >= 0.90:
-            return "CREATE_PR"
-        elif confidence >= 0.75:
-            return "CREATE_DRAFT_PR"
-        elif confidence >= 0.50:
-            return "COMMENT_ONLY"
-        else:
-            return "SKIP"
+        return self._LABELS[bisect.bisect_right(self._THRESHOLDS, confidence)]
+
+    def max_possible_confidence(self, pattern: str, model: str) -> float:
+        """
+        Best-case score for a pattern/model pair.
+
+        Assumes a perfect outcome: AI confidence of 1.0, passing test,
+        and a minimal fix with no complexity penalty. Callers can use
+        this ceiling to skip generation entirely when even a perfect fix
+        could not clear their threshold.
+
+        Args:
+            pattern: Error pattern type
+            model: AI model name
+
+        Returns:
+            Maximum achievable confidence (0.0-1.0)
+        """
+        return _score_kernel(
+            1.0,
+            self.get_model_multiplier(model),
+            0.15,
+            self._get_pattern_boost(pattern),
+            0.0,
+        )
 
     def get_model_multiplier(self, model: str) -> float:
         """
@@ -186,14 +339,15 @@ class ConfidenceScorer:
         model_key = self._normalize_model_name(model)
         return self.MODEL_MULTIPLIERS.get(model_key, 0.60)
 
-    def get_supported_models(self) -> Dict[str, float]:
+    def get_supported_models(self) -> Mapping[str, float]:
         """
         Get all supported models and their multipliers.
 
         Returns:
-            Dict of model names to multipliers
+            Read-only mapping of model names to multipliers; callers that
+            need a mutable copy can wrap it in dict()
         """
-        return self.MODEL_MULTIPLIERS.copy()
+        return self.MODEL_MULTIPLIERS
 
     def should_create_pr(self, confidence: float, min_threshold: float = 0.75) -> bool:
         """
@@ -216,33 +370,8 @@ class ConfidenceScorer:
             recommendation: Recommendation type
 
         Returns:
-            Dict with details about the recommendation
-        """
-        details = {
-            "CREATE_PR": {
-                "action": "Create pull request",
-                "description": "High confidence - create regular PR for review",
-                "draft": False,
-                "min_confidence": 0.90,
-            },
-            "CREATE_DRAFT_PR": {
-                "action": "Create draft pull request",
-                "description": "Good confidence - create draft PR for careful review",
-                "draft": True,
-                "min_confidence": 0.75,
-            },
-            "COMMENT_ONLY": {
-                "action": "Add comment to issue",
-                "description": "Moderate confidence - suggest fix in comment only",
-                "draft": False,
-                "min_confidence": 0.50,
-            },
-            "SKIP": {
-                "action": "Skip fix",
-                "description": "Low confidence - do not apply fix",
-                "draft": False,
-                "min_confidence": 0.0,
-            },
-        }
-
-        return details.get(recommendation, details["SKIP"])
+            Read-only mapping with details about the recommendation
+        """
+        return _RECOMMENDATION_DETAILS.get(
+            recommendation, _RECOMMENDATION_DETAILS["SKIP"]
+        )
@@ -1,9 +1,280 @@
 """AI-powered fix code generation."""
 
+import asyncio
+import hashlib
 import json
+import logging
+import os
+import random
+import re
+import sqlite3
 from typing import Dict, Any, List, Optional
 import litellm
 
+# Prefer orjson for response parsing when available (2-3x faster on the
+# small dicts AI models return); fall back to stdlib json otherwise.
+try:
+    import orjson
+
+    _loads = orjson.loads
+    _JSON_ERRORS = (orjson.JSONDecodeError, json.JSONDecodeError, ValueError, KeyError)
+except ImportError:
+    orjson = None
+    _loads = json.loads
+    _JSON_ERRORS = (json.JSONDecodeError, ValueError, KeyError)
+
+# Child of the queue-backed "autofixer" logger configured in main.py:
+# emitting is a cheap enqueue, so logging inside the concurrent LLM
+# path doesn't serialize tasks on stdout flushes
+logger = logging.getLogger("autofixer.fix_generator")
+
+
+# Share one keep-alive connection pool across every LLM call instead of
+# paying a TCP+TLS handshake per request. LiteLLM routes async calls
+# through aclient_session when set; HTTP/2 needs the optional h2 extra,
+# so fall back to LiteLLM's default client handling if it's absent.
+try:
+    import httpx
+
+    litellm.aclient_session = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        timeout=60.0,
+    )
+except ImportError:
+    pass
+
+# Cap concurrent LLM requests so gather-driven callers don't burst past
+# provider rate limits
+_LLM_SEMAPHORE = asyncio.Semaphore(8)
+
+# Transient provider errors worth retrying; anything else (auth, bad
+# request, context length) fails fast. Resolved defensively since the
+# exception surface varies across LiteLLM versions.
+_RETRYABLE_ERRORS = tuple(
+    exc for exc in (
+        getattr(litellm, name, None)
+        for name in ("RateLimitError", "Timeout", "APIConnectionError",
+                     "ServiceUnavailableError", "InternalServerError")
+    )
+    if isinstance(exc, type) and issubclass(exc, BaseException)
+)
+
+
+def _retry_after_hint(error: BaseException) -> Optional[float]:
+    """Extract a Retry-After delay (seconds) from a provider error, if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        value = headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+async def _acompletion_with_retry(max_attempts: int = 5, **kwargs) -> Any:
+    """
+    Call litellm.acompletion with bounded exponential-backoff retries.
+
+    Transient 429/5xx/timeout errors are retried with capped exponential
+    backoff plus jitter, honoring the provider's Retry-After header when
+    present. The final attempt re-raises so callers see the real error.
+    """
+    for attempt in range(max_attempts):
+        try:
+            return await litellm.acompletion(**kwargs)
+        except _RETRYABLE_ERRORS as e:
+            if attempt == max_attempts - 1:
+                raise
+            delay = min(60.0, 2.0 ** attempt) + random.uniform(0.0, 1.0)
+            retry_after = _retry_after_hint(e)
+            if retry_after is not None:
+                delay = max(delay, min(60.0, retry_after))
+            logger.info(f"⏳ LLM call failed ({type(e).__name__}), "
+                        f"retry {attempt + 1}/{max_attempts - 1} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+# Persistent fix cache shared across sessions and CI runs. Override the
+# path with FIXGEN_CACHE, or set it to "off" to disable; any error while
+# opening degrades silently to the in-memory cache only.
+_CACHE_ENV = "FIXGEN_CACHE"
+_CACHE_DEFAULT = "~/.cache/fixgen.sqlite"
+_cache_conn: Optional[sqlite3.Connection] = None
+_cache_disabled = False
+
+
+def _system_message(text: str, model: str) -> Dict[str, Any]:
+    """
+    Build the system message, marking the static prefix as cacheable.
+
+    Anthropic models honor cache_control on content blocks, billing
+    cached prefix tokens at a fraction of the normal rate on repeated
+    calls within the cache window. OpenAI prefix caching is automatic,
+    so other models get the plain string form.
+
+    Args:
+        text: System prompt text (stable across calls)
+        model: Target model name
+
+    Returns:
+        Message dict for the LiteLLM messages list
+    """
+    model_lower = model.lower()
+    if "claude" in model_lower or "anthropic" in model_lower:
+        return {
+            "role": "system",
+            "content": [{
+                "type": "text",
+                "text": text,
+                "cache_control": {"type": "ephemeral"},
+            }],
+        }
+    return {"role": "system", "content": text}
+
+
+def _content_hash(content: str) -> str:
+    """Hash a file's full content for cache keying."""
+    return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+
+def _get_cache_conn() -> Optional[sqlite3.Connection]:
+    """Open (once) and return the SQLite fix-cache connection, or None."""
+    global _cache_conn, _cache_disabled
+
+    if _cache_disabled or _cache_conn is not None:
+        return _cache_conn
+
+    path = os.environ.get(_CACHE_ENV, _CACHE_DEFAULT)
+    if path.lower() in ("off", "0", ""):
+        _cache_disabled = True
+        return None
+
+    try:
+        path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        # WAL so concurrent CI shards can read while one writes
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS fixes(k TEXT PRIMARY KEY, v TEXT) WITHOUT ROWID"
+        )
+        _cache_conn = conn
+    except (OSError, sqlite3.Error):
+        _cache_disabled = True
+
+    return _cache_conn
+
+
+def _persistent_cache_get(key: str) -> Optional[Dict[str, Any]]:
+    """Look up a fix in the persistent cache; None on miss or error."""
+    conn = _get_cache_conn()
+    if conn is None:
+        return None
+    try:
+        row = conn.execute("SELECT v FROM fixes WHERE k=?", (key,)).fetchone()
+        return _loads(row[0]) if row else None
+    except (sqlite3.Error, *_JSON_ERRORS):
+        return None
+
+
+def _persistent_cache_set(key: str, fix: Dict[str, Any]) -> None:
+    """Store a fix in the persistent cache; errors are non-fatal."""
+    conn = _get_cache_conn()
+    if conn is None:
+        return
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO fixes(k, v) VALUES(?, ?)",
+            (key, json.dumps(fix)),
+        )
+    except sqlite3.Error:
+        pass
+
+
+# Placeholder order shared by every prompt template; positional indices
+# skip the named-argument (kwargs dict) machinery inside str.format
+_PROMPT_FIELDS = ("file_path", "line_number", "error_message", "error_context")
+
+_PROMPT_FIELD_RE = re.compile(
+    r"\{(file_path|line_number|error_message|error_context)\}"
+)
+
+
+def _compile_prompt(template: str) -> str:
+    """
+    Rewrite a named-placeholder prompt into positional form.
+
+    Done once at import: {file_path}..{error_context} become {0}..{3},
+    so per-call formatting passes four positional arguments instead of
+    building a kwargs dict and resolving names per placeholder.
+
+    Args:
+        template: Prompt template using {field} placeholders
+
+    Returns:
+        Template string using {0}..{3} placeholders
+    """
+    return _PROMPT_FIELD_RE.sub(
+        lambda m: "{%d}" % _PROMPT_FIELDS.index(m.group(1)), template
+    )
+
+
+def _slice_json(text: str, opener: str = "{", closer: str = "}") -> str:
+    """
+    Locate the first JSON value in text with a single left-to-right scan.
+
+    Skips an optional markdown code fence, then tracks bracket depth
+    (string- and escape-aware) to find the matching closer. Unlike a
+    find/rfind pair, this handles trailing prose after the JSON and
+    brackets inside string values correctly.
+
+    Args:
+        text: Raw AI response text
+        opener: Opening bracket of the expected value ("{" or "[")
+        closer: Matching closing bracket
+
+    Returns:
+        The JSON slice, or the input (from the first opener, if any)
+        when no balanced value is found
+    """
+    i = 0
+    n = len(text)
+
+    while i < n and text[i].isspace():
+        i += 1
+    if text.startswith("```json", i):
+        i += 7
+    elif text.startswith("```", i):
+        i += 3
+
+    start = text.find(opener, i)
+    if start == -1:
+        return text
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, n):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == opener:
+            depth += 1
+        elif ch == closer:
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+
+    return text[start:]
+
 
 class FixGenerator:
     """Generates code fixes using AI."""
@@ -112,14 +383,35 @@ Analyze the error and provide a fix. Return ONLY valid JSON in this format:
 }}""",
     }
 
-    def __init__(self, model: str = "gpt-4o-mini"):
+    # Prompt for batching several same-pattern failures into one request
+    BATCH_PROMPT = """Fix these Playwright test failures ({pattern} pattern).
+
+{items}
+
+Return ONLY a valid JSON array with exactly {count} objects, in the same
+order as the failures above, each in this format:
+{{
+  "fixed_code": "await page.goto(url)",
+  "explanation": "Brief explanation of fix",
+  "confidence": 0.90
+}}"""
+
+    def __init__(self, model: str = "gpt-4o-mini", api_key: Optional[str] = None):
         """
         Initialize fix generator with AI model.
 
         Args:
             model: AI model to use (gpt-4o-mini, claude-3-5-sonnet-20240620, etc.)
+            api_key: Provider API key; passed per-call to LiteLLM so no
+                process-global environment mutation is needed. Falls back
+                to the provider's usual environment variable when None.
         """
         self.model = model
+        self.api_key = api_key
+        # Content-addressed fix cache: flaky suites produce the same
+        # failure over and over, and each duplicate would otherwise pay a
+        # full LLM round-trip
+        self._fix_cache: Dict[str, Dict[str, Any]] = {}
 
     async def generate_fix(
         self,
@@ -141,7 +433,7 @@ Analyze the error and provide a fix. Return ONLY valid JSON in this format:
             Fix dict with fixed_code, explanation, confidence or None if generation fails
         """
         pattern = failure.get("suggested_pattern", "unknown")
-        prompt_template = self.PROMPTS.get(pattern, self.PROMPTS["unknown"])
+        prompt_builder = _PROMPT_BUILDERS.get(pattern, _PROMPT_BUILDERS["unknown"])
 
         # Extract code context around the failure line
         error_context = self._extract_context(
@@ -149,32 +441,50 @@ Analyze the error and provide a fix. Return ONLY valid JSON in this format:
             failure.get("line_number")
         )
 
-        # Build prompt
-        prompt = prompt_template.format(
-            file_path=failure.get("file_path", "unknown"),
-            line_number=failure.get("line_number", "unknown"),
-            error_message=failure.get("error_message", "Unknown error"),
-            error_context=error_context,
+        # Serve repeated failures from the caches without an LLM call:
+        # in-process first, then the cross-run SQLite cache
+        cache_key = self._cache_key(
+            pattern, failure, error_context, _content_hash(file_content)
+        )
+        cached = self._fix_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+
+        persisted = _persistent_cache_get(cache_key)
+        if persisted is not None:
+            self._fix_cache[cache_key] = persisted
+            return dict(persisted)
+
+        # Build prompt (templates are precompiled to positional form at
+        # import time; argument order matches _PROMPT_FIELDS)
+        prompt = prompt_builder.format(
+            failure.get("file_path", "unknown"),
+            failure.get("line_number", "unknown"),
+            failure.get("error_message", "Unknown error"),
+            error_context,
         )
 
-        # Call AI via LiteLLM
+        # Call AI via LiteLLM (async, so concurrent failures overlap on
+        # network latency instead of serializing)
         try:
-            response = litellm.completion(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a Playwright test fixing expert. Return ONLY valid JSON with fixed_code, explanation, and confidence (0.0-1.0)."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.2,  # Low temperature for consistent fixes
-                max_tokens=500,
-                timeout=30,
-            )
+            async with _LLM_SEMAPHORE:
+                response = await _acompletion_with_retry(
+                    model=self.model,
+                    messages=[
+                        _system_message(
+                            "You are a Playwright test fixing expert. Return ONLY valid JSON with fixed_code, explanation, and confidence (0.0-1.0).",
+                            self.model,
+                        ),
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    temperature=0.2,  # Low temperature for consistent fixes
+                    max_tokens=500,
+                    timeout=30,
+                    api_key=self.api_key,
+                )
 
             # Parse response
             fix_data = self._parse_response(response.choices[0].message.content)
@@ -182,20 +492,307 @@ Analyze the error and provide a fix. Return ONLY valid JSON in this format:
             if fix_data:
                 # Add original pattern info
                 fix_data["pattern"] = pattern
+                self._fix_cache[cache_key] = dict(fix_data)
+                _persistent_cache_set(cache_key, fix_data)
 
             return fix_data
 
         except Exception as e:
-            print(f"Error generating fix: {e}")
+            logger.info(f"Error generating fix: {e}")
             return None
 
-    def _extract_context(self, file_content: str, line_number: Optional[int]) -> str:
+    async def generate_fixes(
+        self,
+        failures: List[Dict[str, Any]],
+        file_contents: Dict[str, str],
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Generate fixes for failures, collapsing duplicates to one call.
+
+        Flaky CI reports the same failure across retries and shards;
+        failures are coalesced on a content hash of (pattern, code
+        context, error message), one fix is generated per unique failure,
+        and the result fans out to every duplicate.
+
+        Args:
+            failures: List of failure dicts (same shape as generate_fix)
+            file_contents: Mapping of file_path to full file content
+
+        Returns:
+            List of fix dicts (None where generation failed), in the same
+            order as failures
+        """
+        keys: List[bytes] = []
+        unique_index: Dict[bytes, int] = {}
+        representatives: List[Dict[str, Any]] = []
+
+        # Split each file once, shared by every failure in that file
+        lines_by_path = {
+            path: content.split('\n') for path, content in file_contents.items()
+        }
+
+        for failure in failures:
+            pattern = failure.get("suggested_pattern", "unknown")
+            path = failure.get("file_path", "")
+            context = self._extract_context(
+                file_contents.get(path, ""),
+                failure.get("line_number"),
+                lines=lines_by_path.get(path),
+            )
+            key = hashlib.blake2b(
+                f"{pattern}|{context}|{failure.get('error_message', '')}".encode(),
+                digest_size=16,
+            ).digest()
+            if key not in unique_index:
+                unique_index[key] = len(representatives)
+                representatives.append(failure)
+            keys.append(key)
+
+        unique_fixes = await self.generate_fixes_batch(representatives, file_contents)
+
+        return [
+            dict(fix) if (fix := unique_fixes[unique_index[key]]) else None
+            for key in keys
+        ]
+
+    async def generate_fixes_batch(
+        self,
+        failures: List[Dict[str, Any]],
+        file_contents: Dict[str, str],
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Generate fixes for several failures at once.
+
+        Failures sharing a pattern are packed into a single model request,
+        amortizing network latency and prompt prefill across the group;
+        groups run concurrently.
+
+        Args:
+            failures: List of failure dicts (same shape as generate_fix)
+            file_contents: Mapping of file_path to full file content
+
+        Returns:
+            List of fix dicts (None where generation failed), in the same
+            order as failures
+        """
+        groups: Dict[str, List[int]] = {}
+        for idx, failure in enumerate(failures):
+            pattern = failure.get("suggested_pattern", "unknown")
+            groups.setdefault(pattern, []).append(idx)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(failures)
+
+        async def _run_group(pattern: str, indices: List[int]) -> None:
+            if len(indices) == 1:
+                # Single failure: reuse the (cached) single-fix path
+                failure = failures[indices[0]]
+                content = file_contents.get(failure.get("file_path", ""), "")
+                results[indices[0]] = await self.generate_fix(failure, content)
+                return
+
+            group = [failures[i] for i in indices]
+            fixes = await self._generate_group(pattern, group, file_contents)
+            for idx, fix in zip(indices, fixes):
+                results[idx] = fix
+
+        await asyncio.gather(
+            *(_run_group(pattern, indices) for pattern, indices in groups.items())
+        )
+
+        return results
+
+    async def _generate_group(
+        self,
+        pattern: str,
+        group: List[Dict[str, Any]],
+        file_contents: Dict[str, str],
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Generate fixes for a group of same-pattern failures in one request.
+
+        Each member is looked up in the in-process and persistent caches
+        first; only the misses are packed into the model request, so a
+        warm rerun of a multi-failure suite skips the LLM call entirely.
+
+        Args:
+            pattern: Shared error pattern
+            group: Failures in the group
+            file_contents: Mapping of file_path to full file content
+
+        Returns:
+            List of fix dicts (None where the model's answer was invalid),
+            in group order
+        """
+        # Split and hash each file once, shared by every failure in it
+        group_paths = {f.get("file_path", "") for f in group}
+        lines_by_path = {
+            path: file_contents.get(path, "").split('\n') for path in group_paths
+        }
+        hash_by_path = {
+            path: _content_hash(file_contents.get(path, "")) for path in group_paths
+        }
+
+        fixes: List[Optional[Dict[str, Any]]] = [None] * len(group)
+        contexts = []
+        cache_keys = []
+        misses = []
+        for i, failure in enumerate(group):
+            path = failure.get("file_path", "")
+            context = self._extract_context(
+                file_contents.get(path, ""),
+                failure.get("line_number"),
+                lines=lines_by_path.get(path),
+            )
+            contexts.append(context)
+            key = self._cache_key(pattern, failure, context, hash_by_path[path])
+            cache_keys.append(key)
+            cached = self._fix_cache.get(key)
+            if cached is None:
+                cached = _persistent_cache_get(key)
+                if cached is not None:
+                    self._fix_cache[key] = cached
+            if cached is not None:
+                fixes[i] = dict(cached)
+            else:
+                misses.append(i)
+
+        if not misses:
+            return fixes
+
+        items = []
+        for n, i in enumerate(misses, 1):
+            failure = group[i]
+            items.append(
+                f"{n}. {failure.get('file_path', 'unknown')}:"
+                f"{failure.get('line_number', '?')}\n"
+                f"Error: {failure.get('error_message', 'Unknown error')}\n"
+                f"{contexts[i]}"
+            )
+
+        prompt = self.BATCH_PROMPT.format(
+            pattern=pattern,
+            items="\n\n".join(items),
+            count=len(misses),
+        )
+
+        try:
+            async with _LLM_SEMAPHORE:
+                response = await _acompletion_with_retry(
+                    model=self.model,
+                    messages=[
+                        _system_message(
+                            "You are a Playwright test fixing expert. Return ONLY a valid JSON array of fixes, each with fixed_code, explanation, and confidence (0.0-1.0).",
+                            self.model,
+                        ),
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    temperature=0.2,
+                    max_tokens=500 * len(misses),
+                    timeout=60,
+                    api_key=self.api_key,
+                )
+        except Exception as e:
+            logger.info(f"Error generating batch fix: {e}")
+            # Cache hits are still good; only the misses are lost
+            return fixes
+
+        generated = self._parse_batch_response(
+            response.choices[0].message.content, len(misses)
+        )
+
+        for i, fix in zip(misses, generated):
+            if fix:
+                fix["pattern"] = pattern
+                self._fix_cache[cache_keys[i]] = dict(fix)
+                _persistent_cache_set(cache_keys[i], fix)
+                fixes[i] = fix
+
+        return fixes
+
+    def _parse_batch_response(
+        self,
+        response_text: str,
+        expected: int,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Parse a JSON-array batch response.
+
+        Args:
+            response_text: Raw AI response
+            expected: Number of fixes requested
+
+        Returns:
+            List of exactly `expected` entries (None where invalid)
+        """
+        try:
+            data = _loads(_slice_json(response_text, "[", "]"))
+        except _JSON_ERRORS as e:
+            logger.info(f"Failed to parse AI batch response: {e}")
+            logger.info(f"Response text: {response_text[:200]}...")
+            return [None] * expected
+
+        if isinstance(data, dict):
+            data = [data]
+        if not isinstance(data, list):
+            return [None] * expected
+
+        fixes: List[Optional[Dict[str, Any]]] = [
+            self._validate_fix(item) if isinstance(item, dict) else None
+            for item in data[:expected]
+        ]
+        fixes.extend([None] * (expected - len(fixes)))
+        return fixes
+
+    def _cache_key(
+        self,
+        pattern: str,
+        failure: Dict[str, Any],
+        error_context: str,
+        content_hash: str,
+    ) -> str:
+        """
+        Build a content-addressed cache key for a failure.
+
+        Args:
+            pattern: Error pattern type
+            failure: Failure data dict
+            error_context: Extracted code context
+            content_hash: Hash of the full file content, so cached fixes
+                are invalidated when the file changes anywhere (not just
+                inside the context window)
+
+        Returns:
+            Hex digest identifying this failure for the current model
+        """
+        parts = "|".join((
+            self.model,
+            pattern,
+            str(failure.get("file_path", "")),
+            str(failure.get("line_number", "")),
+            str(failure.get("error_message", "")),
+            error_context,
+            content_hash,
+        ))
+        return hashlib.blake2b(parts.encode(), digest_size=16).hexdigest()
+
+    def _extract_context(
+        self,
+        file_content: str,
+        line_number: Optional[int],
+        lines: Optional[List[str]] = None,
+    ) -> str:
         """
         Extract 5 lines of context around the error line.
 
         Args:
             file_content: Full file content
             line_number: Line number where error occurred
+            lines: Optional pre-split lines; callers handling several
+                failures in the same file pass this so the file is split
+                once rather than per failure
 
         Returns:
             Context string with line numbers
@@ -204,7 +801,10 @@ Analyze the error and provide a fix. Return ONLY valid JSON in this format:
             # Return first 500 chars if no line number
             return file_content[:500] + ("..." if len(file_content) > 500 else "")
 
-        lines = file_content.split('\n')
+        if lines is None:
+            # maxsplit stops the split right after the context window, so a
+            # 10K-line file does not get split into 10K strings for 5 lines
+            lines = file_content.split('\n', line_number + 2)
 
         # Get context: 2 lines before, error line, 2 lines after
         start = max(0, line_number - 3)
@@ -228,55 +828,60 @@ Analyze the error and provide a fix. Return ONLY valid JSON in this format:
         Returns:
             Parsed dict or None if parsing fails
         """
+        # Common case first: the response is clean JSON, possibly fenced.
+        # removeprefix/removesuffix are O(1) checks and allocate nothing
+        # when the response is already clean.
+        text = response_text.strip()
+        text = text.removeprefix("```json").removeprefix("```").strip()
+        text = text.removesuffix("```").strip()
+
         try:
-            # Remove markdown code blocks if present
-            text = response_text.strip()
-
-            # Handle ```json blocks
-            if "```json" in text:
-                start = text.find("```json") + 7
-                end = text.find("```", start)
-                text = text[start:end].strip()
-            # Handle ``` blocks
-            elif "```" in text:
-                start = text.find("```") + 3
-                end = text.find("```", start)
-                text = text[start:end].strip()
-
-            # Find JSON object if embedded in other text
-            if "{" in text and "}" in text:
-                start = text.find("{")
-                end = text.rfind("}") + 1
-                text = text[start:end]
-
-            # Parse JSON
-            data = json.loads(text)
-
-            # Validate required fields
-            if not isinstance(data, dict):
+            data = _loads(text)
+        except _JSON_ERRORS:
+            # Expensive path last: scan for a JSON object embedded in
+            # surrounding prose
+            try:
+                data = _loads(_slice_json(response_text))
+            except _JSON_ERRORS as e:
+                logger.info(f"Failed to parse AI response: {e}")
+                logger.info(f"Response text: {response_text[:200]}...")
                 return None
 
-            if "fixed_code" not in data:
-                return None
+        # Validate required fields
+        if not isinstance(data, dict):
+            return None
 
-            # Ensure confidence is a float between 0 and 1
-            if "confidence" in data:
-                confidence = float(data["confidence"])
-                data["confidence"] = max(0.0, min(1.0, confidence))
-            else:
-                data["confidence"] = 0.7  # Default confidence
+        return self._validate_fix(data)
 
-            # Ensure explanation exists
-            if "explanation" not in data:
-                data["explanation"] = "AI-generated fix"
+    def _validate_fix(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Validate and normalize a single parsed fix dict.
 
-            return data
+        Args:
+            data: Parsed fix candidate
 
-        except (json.JSONDecodeError, ValueError, KeyError) as e:
-            print(f"Failed to parse AI response: {e}")
-            print(f"Response text: {response_text[:200]}...")
+        Returns:
+            The normalized dict, or None if required fields are missing
+        """
+        if "fixed_code" not in data:
             return None
 
+        # Ensure confidence is a float between 0 and 1
+        if "confidence" in data:
+            try:
+                confidence = float(data["confidence"])
+            except (TypeError, ValueError):
+                confidence = 0.7
+            data["confidence"] = max(0.0, min(1.0, confidence))
+        else:
+            data["confidence"] = 0.7  # Default confidence
+
+        # Ensure explanation exists
+        if "explanation" not in data:
+            data["explanation"] = "AI-generated fix"
+
+        return data
+
     def get_supported_patterns(self) -> List[str]:
         """
         Get list of supported fix patterns.
@@ -285,3 +890,11 @@ Analyze the error and provide a fix. Return ONLY valid JSON in this format:
             List of pattern names
         """
         return [key for key in self.PROMPTS.keys() if key != "unknown"]
+
+
+# Prompt templates compiled once at import; generate_fix substitutes into
+# these instead of re-parsing the raw str.format templates per call.
+_PROMPT_BUILDERS = {
+    pattern: _compile_prompt(template)
+    for pattern, template in FixGenerator.PROMPTS.items()
+}
@@ -1,15 +1,149 @@
 """Playwright Auto-Fixer Dagger Module - Main Integration."""
 
+import asyncio
 import dagger
 from dagger import dag, function, object_type
+import hashlib
+import io
 import json
+import logging
 import os
-from typing import Optional
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, AsyncIterator, Optional
 
 from .fix_generator import FixGenerator
 from .test_runner import TestRunner
 from .confidence_scorer import ConfidenceScorer
 
+# Prefer orjson when available: fix payloads embed full source code and
+# stdlib json's indent path is slow on them. Mirrors the optional-dep
+# handling in fix_generator.
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, indent=2)
+
+    _loads = json.loads
+
+# Optional streaming parser: lets _read_failures stop materializing
+# entries once max_failures is reached on large reports
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+logger = logging.getLogger("autofixer")
+
+
+def _configure_logging() -> None:
+    """
+    Route autofixer logs through a queue so emitting never blocks.
+
+    print() flushes stdout inline on every call, and under concurrent
+    processing those flushes serialize on the GIL. A QueueHandler makes
+    each log call a cheap enqueue; a background QueueListener drains to
+    the console and, when AUTOFIX_LOG_FILE is set, appends to that file
+    with timestamps for CI log analysis.
+    """
+    if logger.handlers:
+        return
+    log_queue = queue.SimpleQueue()
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter("%(message)s"))
+    handlers = [stream]
+    log_file = os.getenv("AUTOFIX_LOG_FILE")
+    if log_file:
+        file_handler = logging.FileHandler(log_file, mode="a")
+        file_handler.setFormatter(
+            logging.Formatter("%(asctime)s %(levelname)s %(message)s")
+        )
+        handlers.append(file_handler)
+    QueueListener(log_queue, *handlers).start()
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+_configure_logging()
+
+
+# Generators are reused across invocations within a session: warm
+# instances keep their fix caches, and providers that cache prompt
+# prefixes see the same static system prompt on every call
+_FIX_GENERATORS: dict = {}
+
+
+def _get_fix_generator(model: str, api_key: Optional[str] = None) -> FixGenerator:
+    """Return a shared FixGenerator for the model, creating it on first use."""
+    key = (model, api_key)
+    generator = _FIX_GENERATORS.get(key)
+    if generator is None:
+        generator = _FIX_GENERATORS[key] = FixGenerator(model=model, api_key=api_key)
+    return generator
+
+
+async def _resolve_secret(secret: Optional[dagger.Secret]) -> Optional[str]:
+    """Read a Dagger secret's plaintext, or None when not provided."""
+    return await secret.plaintext() if secret else None
+
+
+# line_number is part of the key: the same error at different lines
+# needs a fix generated from each line's own code context, so only
+# true retry duplicates (which share the line) may collapse
+_FAILURE_KEY_FIELDS = (
+    "test_name", "file_path", "line_number", "error_message", "suggested_pattern"
+)
+
+
+def _failure_key(failure: dict) -> str:
+    """Content hash identifying a failure for deduplication."""
+    return hashlib.blake2b(
+        json.dumps(
+            {k: failure[k] for k in _FAILURE_KEY_FIELDS if k in failure},
+            sort_keys=True,
+        ).encode(),
+        digest_size=16,
+    ).hexdigest()
+
+
+# Recommendation ranking for picking the strongest action across fixes
+_RECOMMENDATION_PRIORITY = {
+    "CREATE_PR": 3,
+    "CREATE_DRAFT_PR": 2,
+    "COMMENT_ONLY": 1,
+    "SKIP": 0,
+}
+_PRIORITY_TO_RECOMMENDATION = {v: k for k, v in _RECOMMENDATION_PRIORITY.items()}
+
+
+# The pattern and model catalogs are static, so serialize them once at
+# import and let the listing endpoints return string constants. Guarded
+# so a failure here can't break module load; the endpoints rebuild on
+# demand when the constants are missing.
+try:
+    _patterns = FixGenerator().get_supported_patterns()
+    _PATTERNS_JSON: Optional[str] = _dumps({
+        "supported_patterns": _patterns,
+        "count": len(_patterns)
+    })
+    _models = ConfidenceScorer().get_supported_models()
+    _MODELS_JSON: Optional[str] = _dumps({
+        "supported_models": dict(_models),
+        "count": len(_models),
+        "note": "Values are confidence multipliers (higher = more reliable)"
+    })
+    del _patterns, _models
+except Exception:
+    _PATTERNS_JSON = None
+    _MODELS_JSON = None
+
 
 @object_type
 class PlaywrightAutoFixer:
@@ -28,6 +162,7 @@ class PlaywrightAutoFixer:
         ai_model: str = "gpt-4o-mini",
         min_confidence: float = 0.75,
         max_failures: int = 5,
+        concurrency: int = 5,
         openai_api_key: Optional[dagger.Secret] = None,
         anthropic_api_key: Optional[dagger.Secret] = None,
         deepseek_api_key: Optional[dagger.Secret] = None,
@@ -41,6 +176,7 @@ class PlaywrightAutoFixer:
             ai_model: AI model to use for fix generation
             min_confidence: Minimum confidence threshold (0.0-1.0)
             max_failures: Maximum number of failures to process
+            concurrency: Maximum failures processed in parallel
             openai_api_key: OpenAI API key (for GPT models)
             anthropic_api_key: Anthropic API key (for Claude models)
             deepseek_api_key: DeepSeek API key (for DeepSeek models)
@@ -48,81 +184,300 @@ class PlaywrightAutoFixer:
         Returns:
             JSON string with fix results
         """
-        # Set API keys in environment if provided
-        if openai_api_key:
-            os.environ["OPENAI_API_KEY"] = await openai_api_key.plaintext()
-        if anthropic_api_key:
-            os.environ["ANTHROPIC_API_KEY"] = await anthropic_api_key.plaintext()
-        if deepseek_api_key:
-            os.environ["DEEPSEEK_API_KEY"] = await deepseek_api_key.plaintext()
-        print(f"🚀 Starting auto-fix with model: {ai_model}")
-        print(f"📊 Confidence threshold: {min_confidence}")
-
-        # Read failures JSON
-        failures_data = await self._read_failures(repo_dir, failures_json_path)
+        return _dumps(await self._attempt_fix_impl(
+            repo_dir,
+            failures_json_path,
+            ai_model,
+            min_confidence,
+            max_failures,
+            concurrency,
+            openai_api_key,
+            anthropic_api_key,
+            deepseek_api_key,
+        ))
+
+    async def _attempt_fix_impl(
+        self,
+        repo_dir: dagger.Directory,
+        failures_json_path: str,
+        ai_model: str = "gpt-4o-mini",
+        min_confidence: float = 0.75,
+        max_failures: int = 5,
+        concurrency: int = 5,
+        openai_api_key: Optional[dagger.Secret] = None,
+        anthropic_api_key: Optional[dagger.Secret] = None,
+        deepseek_api_key: Optional[dagger.Secret] = None,
+    ) -> dict:
+        """
+        Core of attempt_fix, returning the summary as a plain dict.
+
+        Kept separate so internal callers (fix_and_create_pr) can use
+        the result directly without a JSON serialize/parse round-trip;
+        attempt_fix serializes at the public boundary.
+        """
+        # Resolve provider keys up front and pass the relevant one down
+        # the call chain: mutating os.environ is process-global and racy
+        # under concurrent invocations
+        openai_key, anthropic_key, deepseek_key = await asyncio.gather(
+            _resolve_secret(openai_api_key),
+            _resolve_secret(anthropic_api_key),
+            _resolve_secret(deepseek_api_key),
+        )
+        model_lower = ai_model.lower()
+        if "claude" in model_lower or "anthropic" in model_lower:
+            api_key = anthropic_key
+        elif "deepseek" in model_lower:
+            api_key = deepseek_key
+        else:
+            api_key = openai_key
+        logger.info(f"🚀 Starting auto-fix with model: {ai_model}")
+        logger.info(f"📊 Confidence threshold: {min_confidence}")
+
+        # Read failures JSON; only max_failures entries are materialized
+        failures_data = await self._read_failures(
+            repo_dir, failures_json_path, max_failures
+        )
 
         if not failures_data or not failures_data.get("failures"):
-            return json.dumps({
+            return {
                 "status": "no_failures",
                 "message": "No failures found in JSON",
                 "fixes": []
-            })
+            }
 
         # Initialize components
-        fix_generator = FixGenerator(model=ai_model)
+        fix_generator = _get_fix_generator(ai_model, api_key)
         test_runner = TestRunner()
         confidence_scorer = ConfidenceScorer()
 
-        print(f"📝 Found {len(failures_data['failures'])} failures")
+        total_failures = failures_data.get("total", len(failures_data["failures"]))
+        logger.info(f"📝 Found {total_failures} failures")
 
-        results = []
         failures_to_process = failures_data["failures"][:max_failures]
 
-        # Process each failure
-        for idx, failure in enumerate(failures_to_process, 1):
-            print(f"\n🔧 Processing failure {idx}/{len(failures_to_process)}: {failure.get('test_name', 'Unknown')}")
+        # Drop failures whose best-case score cannot clear the threshold:
+        # even a perfect fix for a weak pattern/model pairing would be
+        # rejected later, so skip the LLM call and container run entirely
+        viable = []
+        for failure in failures_to_process:
+            ceiling = confidence_scorer.max_possible_confidence(
+                failure.get("suggested_pattern", "unknown"), ai_model
+            )
+            if ceiling < min_confidence:
+                logger.info(f"⏭️  Skipping {failure.get('test_name', 'Unknown')} "
+                      f"(unreachable threshold: max {ceiling:.2%} < {min_confidence:.2%})")
+            else:
+                viable.append(failure)
+        failures_to_process = viable
+
+        # Collapse structurally identical failures (flaky retries report
+        # the same test + error repeatedly) so each unique failure pays
+        # for one fix generation and one container run; accepted results
+        # are fanned back out to the duplicates below
+        dedup_order = []
+        dup_groups: dict = {}
+        for failure in failures_to_process:
+            key = _failure_key(failure)
+            if key not in dup_groups:
+                dedup_order.append(key)
+                dup_groups[key] = []
+            dup_groups[key].append(failure)
+        unique_failures = [dup_groups[key][0] for key in dedup_order]
+        if len(unique_failures) < len(failures_to_process):
+            logger.info(f"🔁 Collapsed {len(failures_to_process)} failures "
+                        f"into {len(unique_failures)} unique")
+
+        # Preload file contents once per unique path, then generate all
+        # fixes up front: generate_fixes dedups identical failures and
+        # batches same-pattern groups into single model requests. Reads
+        # are independent Dagger calls, so fetch them concurrently.
+        unique_paths = sorted({f.get("file_path") for f in unique_failures if f.get("file_path")})
+        contents = await asyncio.gather(
+            *(self._read_file(repo_dir, path) for path in unique_paths)
+        )
+        file_contents = dict(zip(unique_paths, contents))
+
+        # Failures with no file path or an unreadable file can never
+        # produce an applicable fix — _process_one discards them anyway —
+        # so drop them before fix generation rather than paying for an
+        # LLM round-trip whose result is thrown away. dedup_order is
+        # filtered in lockstep to keep the index-to-key mapping aligned.
+        generable = []
+        for key, failure in zip(dedup_order, unique_failures):
+            file_path = failure.get("file_path")
+            if not file_path:
+                logger.info(f"⚠️  Skipping {failure.get('test_name', 'Unknown')}: "
+                            f"no file path in failure data")
+            elif not file_contents.get(file_path):
+                logger.info(f"⚠️  Skipping {failure.get('test_name', 'Unknown')}: "
+                            f"could not read file: {file_path}")
+            else:
+                generable.append((key, failure))
+        dedup_order = [key for key, _ in generable]
+        unique_failures = [failure for _, failure in generable]
+        if not unique_failures:
+            return {
+                "status": "completed",
+                "total_failures": total_failures,
+                "processed": len(failures_to_process),
+                "fixes_generated": 0,
+                "average_confidence": 0.0,
+                "model": ai_model,
+                "threshold": min_confidence,
+                "fixes": []
+            }
+
+        logger.info(f"🤖 Generating fixes with AI (batched)...")
+        fixes = await fix_generator.generate_fixes(unique_failures, file_contents)
+
+        # Stream accepted fixes as they complete; collecting into a list
+        # here keeps the JSON response shape unchanged, while callers
+        # that want time-to-first-fix can consume _iter_fixes directly
+        unique_results = [
+            pair async for pair in self._iter_fixes(
+                repo_dir,
+                unique_failures,
+                fixes,
+                file_contents,
+                test_runner,
+                confidence_scorer,
+                ai_model,
+                min_confidence,
+                concurrency,
+            )
+        ]
+
+        # This consumer collects the whole list, so restore input order:
+        # completion order is nondeterministic and would otherwise leak
+        # into the fixes array, PR section numbering, and the branch name
+        # derived from fixes[0]. Streaming callers still see completion
+        # order from _iter_fixes itself.
+        unique_results.sort(key=lambda pair: pair[0])
+
+        # Fan each accepted result back out to the duplicates it covers,
+        # reusing the fix and test outcome paid for by the representative.
+        # _iter_fixes yields each result with its index into the unique
+        # list, which maps straight to the dedup key — no reverse lookup
+        # on result fields, which would collide for failures differing
+        # only in error_message
+        results = []
+        for idx, result in unique_results:
+            group = dup_groups[dedup_order[idx]]
+            # Duplicates share every keyed field including line_number,
+            # so each gets an identical copy of the result
+            results.append(result)
+            results.extend(dict(result) for _ in range(len(group) - 1))
+
+        # Calculate summary statistics
+        total_processed = len(failures_to_process)
+        total_accepted = len(results)
+        avg_confidence = sum(r["final_confidence"] for r in results) / len(results) if results else 0.0
+
+        logger.info(f"\n📊 Summary:")
+        logger.info(f"   Total failures: {total_failures}")
+        logger.info(f"   Processed: {total_processed}")
+        logger.info(f"   Accepted: {total_accepted}")
+        logger.info(f"   Avg confidence: {avg_confidence:.2%}")
+
+        return {
+            "status": "completed",
+            "total_failures": total_failures,
+            "processed": total_processed,
+            "fixes_generated": total_accepted,
+            "average_confidence": avg_confidence,
+            "model": ai_model,
+            "threshold": min_confidence,
+            "fixes": results
+        }
+
+    async def _iter_fixes(
+        self,
+        repo_dir: dagger.Directory,
+        failures: list,
+        fixes: list,
+        file_contents: dict,
+        test_runner: TestRunner,
+        confidence_scorer: ConfidenceScorer,
+        ai_model: str,
+        min_confidence: float,
+        concurrency: int,
+    ) -> AsyncIterator[tuple]:
+        """
+        Test, score, and yield accepted fixes as each one finishes.
+
+        Failures are processed concurrently under a bounded semaphore and
+        yielded in completion order, so consumers see the first accepted
+        fix after min(latency) instead of waiting for the slowest one.
+        Each fix is yielded as (index, result), where index is the
+        failure's position in the input list, so callers can map results
+        back to their failures without inspecting result fields.
+        Per-failure errors are logged and swallowed rather than aborting
+        the stream.
+
+        Args:
+            repo_dir: Repository directory
+            failures: Failures to process (already threshold-filtered)
+            fixes: Generated fix dicts, aligned with failures
+            file_contents: Preloaded file contents keyed by path
+            test_runner: Shared TestRunner instance
+            confidence_scorer: Shared ConfidenceScorer instance
+            ai_model: AI model name (for scoring)
+            min_confidence: Minimum confidence to accept a fix
+            concurrency: Maximum failures processed in parallel
+
+        Yields:
+            (index, result) tuples for accepted fixes
+        """
+        sem = asyncio.Semaphore(max(1, concurrency))
 
-            try:
-                # Read file content
+        async def _process_one(idx: int, failure: dict, fix_data: Optional[dict]) -> Optional[dict]:
+            async with sem:
+                # Hoist repeated dict lookups into locals; each is read
+                # several times below
+                test_name = failure.get("test_name", "Unknown")
                 file_path = failure.get("file_path")
-                if not file_path:
-                    print(f"⚠️  No file path in failure data")
-                    continue
+                pattern = failure.get("suggested_pattern")
 
-                file_content = await self._read_file(repo_dir, file_path)
-                if not file_content:
-                    print(f"⚠️  Could not read file: {file_path}")
-                    continue
+                logger.info(f"\n🔧 Processing failure {idx + 1}/{len(failures)}: {test_name}")
 
-                print(f"📄 Read file: {file_path}")
+                if not file_path:
+                    logger.info(f"⚠️  No file path in failure data")
+                    return None
 
-                # Generate fix
-                print(f"🤖 Generating fix with AI...")
-                fix_data = await fix_generator.generate_fix(failure, file_content)
+                if not file_contents.get(file_path):
+                    logger.info(f"⚠️  Could not read file: {file_path}")
+                    return None
 
                 if not fix_data:
-                    print(f"❌ Failed to generate fix")
-                    continue
+                    logger.info(f"❌ Failed to generate fix")
+                    return None
 
-                print(f"✅ Fix generated (AI confidence: {fix_data.get('confidence', 0):.2%})")
+                fixed_code = fix_data["fixed_code"]
+                ai_confidence = fix_data.get("confidence", 0.7)
+                logger.info(f"✅ Fix generated (AI confidence: {ai_confidence:.2%})")
 
                 # Apply fix and run test
-                print(f"🧪 Testing fix in container...")
-                test_result = await test_runner.run_test(
-                    repo_dir,
-                    file_path,
-                    fix_data["fixed_code"]
-                )
+                logger.info(f"🧪 Testing fix in container...")
+                try:
+                    test_result = await test_runner.run_test(
+                        repo_dir,
+                        file_path,
+                        fixed_code
+                    )
+                except Exception as e:
+                    logger.info(f"❌ Error processing {file_path}: {e}")
+                    return None
 
                 test_passed = test_result.get("passed", False)
-                print(f"{'✅' if test_passed else '❌'} Test {'passed' if test_passed else 'failed'}")
+                logger.info(f"{'✅' if test_passed else '❌'} Test {'passed' if test_passed else 'failed'}")
 
-                # Calculate confidence
-                fix_complexity = len(fix_data["fixed_code"].split('\n'))
+                # Calculate confidence; count('\n') avoids materializing
+                # a list of lines just to count them
+                fix_complexity = fixed_code.count('\n') + 1
                 confidence_result = confidence_scorer.calculate_confidence(
-                    ai_confidence=fix_data.get("confidence", 0.7),
+                    ai_confidence=ai_confidence,
                     test_passed=test_passed,
-                    pattern=failure.get("suggested_pattern", "unknown"),
+                    pattern=pattern or "unknown",
                     model=ai_model,
                     fix_complexity=fix_complexity
                 )
@@ -130,52 +485,45 @@ class PlaywrightAutoFixer:
                 final_confidence = confidence_result["confidence"]
                 recommendation = confidence_result["recommendation"]
 
-                print(f"📊 Final confidence: {final_confidence:.2%} -> {recommendation}")
+                logger.info(f"📊 Final confidence: {final_confidence:.2%} -> {recommendation}")
 
-                # Store result if confidence meets threshold
+                # Return result only if confidence meets threshold
                 if final_confidence >= min_confidence:
-                    results.append({
-                        "test_name": failure.get("test_name", "Unknown"),
+                    logger.info(f"✅ Fix accepted (meets threshold)")
+                    return {
+                        "test_name": test_name,
                         "file": file_path,
                         "line_number": failure.get("line_number"),
-                        "pattern": failure.get("suggested_pattern"),
-                        "fix": fix_data["fixed_code"],
+                        "pattern": pattern,
+                        "fix": fixed_code,
                         "explanation": fix_data.get("explanation"),
-                        "ai_confidence": fix_data.get("confidence"),
+                        "ai_confidence": ai_confidence,
                         "final_confidence": final_confidence,
                         "recommendation": recommendation,
                         "test_passed": test_passed,
                         "test_duration_ms": test_result.get("duration_ms", 0),
-                    })
-                    print(f"✅ Fix accepted (meets threshold)")
-                else:
-                    print(f"⚠️  Fix rejected (below threshold: {final_confidence:.2%} < {min_confidence:.2%})")
+                    }
 
-            except Exception as e:
-                print(f"❌ Error processing {failure.get('file_path')}: {e}")
-                continue
+                logger.info(f"⚠️  Fix rejected (below threshold: {final_confidence:.2%} < {min_confidence:.2%})")
+                return None
 
-        # Calculate summary statistics
-        total_processed = len(failures_to_process)
-        total_accepted = len(results)
-        avg_confidence = sum(r["final_confidence"] for r in results) / len(results) if results else 0.0
-
-        print(f"\n📊 Summary:")
-        print(f"   Total failures: {len(failures_data['failures'])}")
-        print(f"   Processed: {total_processed}")
-        print(f"   Accepted: {total_accepted}")
-        print(f"   Avg confidence: {avg_confidence:.2%}")
+        async def _tagged(idx: int, failure: dict, fix_data: Optional[dict]) -> tuple:
+            return idx, await _process_one(idx, failure, fix_data)
 
-        return json.dumps({
-            "status": "completed",
-            "total_failures": len(failures_data["failures"]),
-            "processed": total_processed,
-            "fixes_generated": total_accepted,
-            "average_confidence": avg_confidence,
-            "model": ai_model,
-            "threshold": min_confidence,
-            "fixes": results
-        }, indent=2)
+        tasks = [
+            asyncio.ensure_future(_tagged(idx, failure, fix_data))
+            for idx, (failure, fix_data) in enumerate(zip(failures, fixes))
+        ]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                idx, outcome = await completed
+                if outcome:
+                    yield idx, outcome
+        finally:
+            # Consumer may stop early (e.g. after the first accepted fix);
+            # don't leave container runs dangling
+            for task in tasks:
+                task.cancel()
 
     @function
     async def fix_and_create_pr(
@@ -213,13 +561,15 @@ class PlaywrightAutoFixer:
         """
         from .pr_creator import PRCreator
 
-        print(f"\n🚀 Starting fix-and-create-PR workflow")
-        print(f"   Issue: #{issue_number}")
-        print(f"   Model: {ai_model}")
-        print(f"   Threshold: {min_confidence}")
+        logger.info(f"\n🚀 Starting fix-and-create-PR workflow")
+        logger.info(f"   Issue: #{issue_number}")
+        logger.info(f"   Model: {ai_model}")
+        logger.info(f"   Threshold: {min_confidence}")
 
-        # Generate fixes (reuse attempt_fix logic)
-        results_json = await self.attempt_fix(
+        # Generate fixes (reuse attempt_fix logic); the impl returns a
+        # dict directly, avoiding a serialize/parse round-trip on a
+        # payload that includes full source code
+        results = await self._attempt_fix_impl(
             repo_dir,
             failures_json_path,
             ai_model,
@@ -229,11 +579,9 @@ class PlaywrightAutoFixer:
             deepseek_api_key=deepseek_api_key
         )
 
-        results = json.loads(results_json)
-
         if results["status"] != "completed" or not results["fixes"]:
-            print(f"❌ No fixes generated")
-            return json.dumps({
+            logger.info(f"❌ No fixes generated")
+            return _dumps({
                 "status": "no_fixes_generated",
                 "message": "No fixes met the confidence threshold",
                 "issue_number": issue_number
@@ -246,12 +594,12 @@ class PlaywrightAutoFixer:
         if not repository:
             repository = os.getenv("GITHUB_REPOSITORY", "")
             if not repository:
-                return json.dumps({
+                return _dumps({
                     "status": "error",
                     "message": "GITHUB_REPOSITORY environment variable not set"
                 })
 
-        print(f"📦 Repository: {repository}")
+        logger.info(f"📦 Repository: {repository}")
 
         # Create PR creator
         pr_creator = PRCreator(
@@ -259,28 +607,28 @@ class PlaywrightAutoFixer:
             repository=repository
         )
 
-        # Calculate overall confidence
+        # One pass over the fixes: track the strongest recommendation
+        # and accumulate confidence at the same time, instead of a sum
+        # plus three membership scans over an intermediate list
         fixes = results["fixes"]
-        overall_confidence = sum(f["final_confidence"] for f in fixes) / len(fixes)
-
-        print(f"📊 Overall confidence: {overall_confidence:.2%}")
+        top_priority = 0
+        confidence_sum = 0.0
+        for f in fixes:
+            priority = _RECOMMENDATION_PRIORITY.get(f.get("recommendation", "SKIP"), 0)
+            if priority > top_priority:
+                top_priority = priority
+            confidence_sum += f["final_confidence"]
 
-        # Determine action based on highest recommendation
-        recommendations = [f.get("recommendation", "SKIP") for f in fixes]
-        top_recommendation = "SKIP"
+        overall_confidence = confidence_sum / len(fixes)
+        top_recommendation = _PRIORITY_TO_RECOMMENDATION[top_priority]
 
-        if "CREATE_PR" in recommendations:
-            top_recommendation = "CREATE_PR"
-        elif "CREATE_DRAFT_PR" in recommendations:
-            top_recommendation = "CREATE_DRAFT_PR"
-        elif "COMMENT_ONLY" in recommendations:
-            top_recommendation = "COMMENT_ONLY"
+        logger.info(f"📊 Overall confidence: {overall_confidence:.2%}")
 
-        print(f"🎯 Action: {top_recommendation}")
+        logger.info(f"🎯 Action: {top_recommendation}")
 
         # Handle different recommendations
         if top_recommendation == "SKIP":
-            return json.dumps({
+            return _dumps({
                 "status": "skipped",
                 "message": "All fixes below confidence threshold",
                 "issue_number": issue_number,
@@ -296,7 +644,7 @@ class PlaywrightAutoFixer:
                 confidence=overall_confidence,
             )
 
-            return json.dumps({
+            return _dumps({
                 "status": "comment_added" if success else "comment_failed",
                 "message": "Fix suggestions added as comment (confidence too low for PR)",
                 "issue_number": issue_number,
@@ -310,7 +658,7 @@ class PlaywrightAutoFixer:
             primary_pattern = fixes[0].get("pattern", "unknown")
             branch_name = f"autofix/issue-{issue_number}-{primary_pattern}"
 
-            print(f"🌿 Branch: {branch_name}")
+            logger.info(f"🌿 Branch: {branch_name}")
 
             # First, create branch and commit fixes
             branch_result = pr_creator.create_branch_and_commit(
@@ -320,15 +668,15 @@ class PlaywrightAutoFixer:
             )
 
             if not branch_result.get("success"):
-                print(f"❌ Failed to create branch")
-                return json.dumps({
+                logger.info(f"❌ Failed to create branch")
+                return _dumps({
                     "status": "branch_failed",
                     "error": branch_result.get("error", "Unknown error"),
                     "issue_number": issue_number,
                     "fixes_count": len(fixes),
-                }, indent=2)
+                })
 
-            print(f"✅ Branch created and fixes committed")
+            logger.info(f"✅ Branch created and fixes committed")
 
             # Now create PR
             is_draft = (top_recommendation == "CREATE_DRAFT_PR" or overall_confidence < 0.90)
@@ -343,8 +691,8 @@ class PlaywrightAutoFixer:
             )
 
             if pr_result.get("success"):
-                print(f"✅ PR created successfully!")
-                return json.dumps({
+                logger.info(f"✅ PR created successfully!")
+                return _dumps({
                     "status": "pr_created",
                     "pr_url": pr_result["pr_url"],
                     "branch": branch_name,
@@ -352,36 +700,58 @@ class PlaywrightAutoFixer:
                     "fixes_applied": len(fixes),
                     "average_confidence": overall_confidence,
                     "is_draft": is_draft,
-                }, indent=2)
+                })
             else:
-                print(f"❌ PR creation failed")
-                return json.dumps({
+                logger.info(f"❌ PR creation failed")
+                return _dumps({
                     "status": "pr_failed",
                     "error": pr_result.get("error", "Unknown error"),
                     "issue_number": issue_number,
                     "fixes_count": len(fixes),
-                }, indent=2)
+                })
 
     async def _read_failures(
         self,
         repo_dir: dagger.Directory,
-        path: str
+        path: str,
+        max_failures: Optional[int] = None,
     ) -> Optional[dict]:
         """
         Read and parse failures JSON.
 
+        When max_failures is set, only that many failure entries are
+        materialized; the remainder are counted so "total" stays
+        accurate. Uses ijson to stream-parse when installed, otherwise
+        falls back to a full parse and truncates.
+
         Args:
             repo_dir: Repository directory
             path: Path to failures JSON file
+            max_failures: Cap on failure entries to materialize
 
         Returns:
-            Parsed JSON dict or None if read fails
+            Dict with "failures" (capped) and "total", or None if the
+            read fails
         """
         try:
             content = await repo_dir.file(path).contents()
-            return json.loads(content)
+            if ijson is not None:
+                failures = []
+                total = 0
+                for item in ijson.items(io.BytesIO(content.encode()), "failures.item"):
+                    total += 1
+                    if max_failures is None or len(failures) < max_failures:
+                        failures.append(item)
+                return {"failures": failures, "total": total}
+
+            data = _loads(content)
+            failures = data.get("failures") or []
+            total = len(failures)
+            if max_failures is not None:
+                failures = failures[:max_failures]
+            return {"failures": failures, "total": total}
         except Exception as e:
-            print(f"❌ Error reading failures: {e}")
+            logger.info(f"❌ Error reading failures: {e}")
             return None
 
     async def _read_file(
@@ -402,7 +772,7 @@ class PlaywrightAutoFixer:
         try:
             return await repo_dir.file(path).contents()
         except Exception as e:
-            print(f"❌ Error reading file {path}: {e}")
+            logger.info(f"❌ Error reading file {path}: {e}")
             return ""
 
     @function
@@ -413,13 +783,14 @@ class PlaywrightAutoFixer:
         Returns:
             JSON string with pattern information
         """
-        fix_generator = FixGenerator()
-        patterns = fix_generator.get_supported_patterns()
+        if _PATTERNS_JSON is not None:
+            return _PATTERNS_JSON
 
-        return json.dumps({
+        patterns = FixGenerator().get_supported_patterns()
+        return _dumps({
             "supported_patterns": patterns,
             "count": len(patterns)
-        }, indent=2)
+        })
 
     @function
     async def list_supported_models(self) -> str:
@@ -429,11 +800,12 @@ class PlaywrightAutoFixer:
         Returns:
             JSON string with model information
         """
-        confidence_scorer = ConfidenceScorer()
-        models = confidence_scorer.get_supported_models()
+        if _MODELS_JSON is not None:
+            return _MODELS_JSON
 
-        return json.dumps({
-            "supported_models": models,
+        models = ConfidenceScorer().get_supported_models()
+        return _dumps({
+            "supported_models": dict(models),
             "count": len(models),
             "note": "Values are confidence multipliers (higher = more reliable)"
-        }, indent=2)
+        })
@@ -2,21 +2,284 @@
 
 import base64
 import json
+import logging
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
-from datetime import datetime
-import requests
+
+# Prefer orjson for parsing API responses when available (C-level UTF-8
+# decode, no per-key Python overhead); fall back to stdlib json.
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    _loads = json.loads
+
+# Child of the "autofixer" logger main.py configures with a queue-based
+# non-blocking handler; status lines ride that pipeline instead of
+# paying a flushed stdout write each (print is line-buffered at best in
+# CI). Standalone imports fall back to normal logging propagation.
+logger = logging.getLogger("autofixer.pr_creator")
+
+# requests pulls in urllib3, ssl, and certifi — tens of milliseconds of
+# import work that callers only using the markdown formatters never
+# need. The HTTP stack is loaded on first PRCreator construction; until
+# then _HTTP_ERRORS is empty (and the except clauses that read it can
+# only run after construction).
+_requests = None
+_HTTPAdapter = None
+_Retry = None
+httpx = None
+_HTTP_ERRORS: tuple = ()
+
+
+def _load_http_stack():
+    """Import requests/urllib3 (and optional httpx) on first use."""
+    global _requests, _HTTPAdapter, _Retry, httpx, _HTTP_ERRORS
+    if _requests is not None:
+        return _requests
+
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    # Optional HTTP/2 client: multiplexes concurrent uploads over a
+    # single connection instead of one socket per worker.
+    try:
+        import httpx as httpx_mod
+    except ImportError:
+        httpx_mod = None
+
+    _requests = requests
+    _HTTPAdapter = HTTPAdapter
+    _Retry = Retry
+    httpx = httpx_mod
+
+    # Error types raised by whichever client handled the request
+    errors = (requests.exceptions.RequestException,)
+    if httpx_mod is not None:
+        errors = errors + (httpx_mod.HTTPError,)
+    _HTTP_ERRORS = errors
+
+    return requests
+
+@lru_cache(maxsize=64)
+def _pattern_title(pattern: str) -> str:
+    """Human-readable pattern name; cached since batches repeat a handful."""
+    return pattern.replace("_", " ").title()
+
+
+@dataclass(frozen=True, slots=True)
+class _FixSummary:
+    """Per-batch aggregates computed in one pass over the fix list.
+
+    The title, body, and commit-message formatters all need the same
+    pattern list, pattern counts, and pass tally; summarizing once means
+    the fix list is walked a single time instead of once per formatter.
+    """
+
+    patterns: tuple
+    counts: Counter
+    unique: int
+    passed: int
+
+
+def _summarize(fixes: List[Dict[str, Any]]) -> _FixSummary:
+    """Build a _FixSummary from a list of fix dicts."""
+    patterns = tuple(f.get("pattern", "unknown") for f in fixes)
+    counts = Counter(patterns)
+    passed = sum(1 for f in fixes if f.get("test_passed"))
+    return _FixSummary(
+        patterns=patterns, counts=counts, unique=len(counts), passed=passed,
+    )
+
+
+# Markdown and commit-message templates, built once at import. The
+# formatters below substitute into these instead of assembling dozens
+# of list fragments per call; only the per-fix blocks involve a loop.
+# The "### {i}. " heading prefix is prepended at the call site so the
+# cached block body is index-free and duplicate fixes share one entry
+_PR_FIX_BLOCK_TMPL = """{test_name}
+
+**File**: `{file}`
+**Pattern**: `{pattern}`
+**Confidence**: {confidence:.0%}
+**Test Result**: {test_result}
+
+**Explanation**:
+{explanation}
+
+<details>
+<summary>View fix code</summary>
+
+```javascript
+{code}
+```
+</details>
+
+---
+"""
+
+_PR_BODY_TMPL = """# 🤖 Automated Fix
+
+Fixes #{issue_number}
+
+## Summary
+
+This PR contains **{fix_count} automated fix(es)** for test failures.
+
+**Overall Confidence**: {confidence:.0%}
+
+**Patterns Fixed**:
+{pattern_lines}
+
+## Changes Made
+
+{fix_blocks}
+## Testing
+
+- [x] Fixes generated by AI
+- [x] Fixes tested in isolated containers
+{tested_line}
+- [ ] Manual review completed
+- [ ] Full test suite verified
+
+## ⚠️ Important
+
+This is an **automated fix** generated by AI. Please:
+
+1. ✅ **Review the changes carefully** - AI can make mistakes
+2. 🧪 **Run the full test suite locally** - Container tests are isolated
+3. 🔍 **Verify no regressions** - Check related functionality
+4. 🎯 **Test edge cases** - Automated tests may not cover everything
+
+💬 Questions? Comment on issue #{issue_number}
+
+---
+
+🤖 Generated by [Playwright Auto-Fixer](https://github.com/{repository})
+⏰ {timestamp}"""
+
+@lru_cache(maxsize=256)
+def _render_fix_block(
+    test_name: str,
+    file: str,
+    pattern: str,
+    confidence: float,
+    test_result: str,
+    explanation: str,
+    code: str,
+) -> str:
+    """Render one PR-body fix block (sans numbered heading); memoized
+    since retried failures produce identical fixes within and across
+    create_pr calls."""
+    return _PR_FIX_BLOCK_TMPL.format(
+        test_name=test_name,
+        file=file,
+        pattern=pattern,
+        confidence=confidence,
+        test_result=test_result,
+        explanation=explanation,
+        code=code,
+    )
+
+
+_COMMIT_MESSAGE_TMPL = """fix: auto-fix {pattern_desc} ({fix_count} file(s))
+
+Automated fixes generated by Playwright Auto-Fixer:
+
+{file_lines}
+
+🤖 Generated with AI
+Co-Authored-By: Playwright Auto-Fixer <noreply@github.com>"""
+
+# As with the PR block, the "#### {i}. " prefix is added by the caller
+_COMMENT_FIX_BLOCK_TMPL = """{test_name}
+
+**Pattern**: `{pattern}`
+**Confidence**: {confidence:.0%}
+
+**Explanation**: {explanation}
+
+<details>
+<summary>View suggested fix</summary>
+
+```javascript
+{code}
+```
+</details>
+"""
+
+@lru_cache(maxsize=256)
+def _render_comment_block(
+    test_name: str,
+    pattern: str,
+    confidence: float,
+    explanation: str,
+    code: str,
+) -> str:
+    """Render one issue-comment fix block (sans numbered heading);
+    memoized like the PR blocks."""
+    return _COMMENT_FIX_BLOCK_TMPL.format(
+        test_name=test_name,
+        pattern=pattern,
+        confidence=confidence,
+        explanation=explanation,
+        code=code,
+    )
+
+
+_ISSUE_COMMENT_TMPL = """## 🤖 Auto-Fix Suggestions
+
+I analyzed the test failures and generated **{fix_count} potential fix(es)**.
+
+**Confidence**: {confidence:.0%} (below threshold for automatic PR)
+
+### Suggested Fixes
+
+{fix_blocks}
+---
+
+⚠️ These fixes have **lower confidence** and should be reviewed carefully.
+
+To apply these fixes manually:
+1. Review each suggestion
+2. Test thoroughly
+3. Adjust as needed
+
+🤖 Generated by Playwright Auto-Fixer"""
 
 
 class PRCreator:
     """Creates GitHub PRs with auto-fixes using GitHub REST API."""
 
-    def __init__(self, token: str, repository: str):
+    # How long (seconds) resolved base refs stay valid; long enough to
+    # cover back-to-back fix batches in one workflow run, short enough
+    # that a push to the base branch is picked up promptly
+    _BASE_CACHE_TTL = 30.0
+
+    # Retry policy shared by both transports: the requests session gets
+    # it via the urllib3 Retry on its adapter, and _request replays the
+    # same policy for the httpx client, which has no adapter hook
+    _RETRY_TOTAL = 5
+    _RETRY_BACKOFF = 1.0
+    _RETRY_STATUSES = frozenset((403, 429, 500, 502, 503, 504))
+
+    def __init__(self, token: str, repository: str, http2: bool = True):
         """
         Initialize PR creator.
 
         Args:
             token: GitHub token with repo and PR permissions
             repository: Repository in format "owner/repo"
+            http2: Prefer an HTTP/2 client when httpx (with the h2
+                extra) is installed; the requests session is always
+                kept as fallback
         """
         self.token = token
         self.repository = repository
@@ -28,6 +291,179 @@ class PRCreator:
             "Content-Type": "application/json",
         }
 
+        requests = _load_http_stack()
+
+        # All calls hit api.github.com, so one keep-alive session avoids
+        # paying a TCP+TLS handshake per request (branch creation alone
+        # makes 5+ sequential calls); transient 429/5xx are retried with
+        # backoff at the adapter level
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # GitHub signals both primary and secondary rate limits with
+        # 403/429 plus a Retry-After header; honoring it at the adapter
+        # level avoids request storms that only lengthen the server-side
+        # backoff window
+        retry = _Retry(
+            total=5,
+            backoff_factor=1.0,
+            status_forcelist=(403, 429, 500, 502, 503, 504),
+            respect_retry_after_header=True,
+            allowed_methods=frozenset(["GET", "POST", "PATCH"]),
+        )
+        self.session.mount("https://", _HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=retry,
+        ))
+
+        # Base-ref lookups repeat across back-to-back fix batches in one
+        # workflow run; cache (base_sha, base_tree_sha) per branch with
+        # a short TTL so quick successive runs skip the round-trip
+        self._base_cache: Dict[str, tuple] = {}
+
+        # GraphQL node IDs are stable; resolve the repository and label
+        # IDs once per creator and reuse them for every PR
+        self._repo_node_id: Optional[str] = None
+        self._label_ids: Dict[str, str] = {}
+
+        # HTTP/2 lets the parallel uploads share one multiplexed
+        # connection; requires the optional httpx[http2] install
+        self._client = None
+        if http2 and httpx is not None:
+            try:
+                self._client = httpx.Client(
+                    http2=True,
+                    headers=self.headers,
+                    limits=httpx.Limits(max_keepalive_connections=8),
+                    timeout=30.0,
+                )
+            except ImportError:
+                self._client = None
+
+    def _request(self, method: str, url: str, json=None, params=None):
+        """
+        Issue a request via the HTTP/2 client when available.
+
+        Both clients return response objects supporting
+        raise_for_status()/json()/content, so call sites are agnostic.
+        Transient 403/429/5xx responses on the httpx path are retried
+        here with the same backoff policy the requests session applies
+        at its adapter, honoring Retry-After when the server sends one.
+
+        Args:
+            method: HTTP method ("GET", "POST", "PATCH")
+            url: Full URL
+            json: Optional JSON body
+            params: Optional query parameters
+
+        Returns:
+            Response object
+        """
+        if self._client is None:
+            response = self.session.request(method, url, json=json, params=params)
+            self._respect_rate_limit(response.headers)
+            return response
+
+        for attempt in range(self._RETRY_TOTAL + 1):
+            response = self._client.request(method, url, json=json, params=params)
+            if (response.status_code not in self._RETRY_STATUSES
+                    or attempt == self._RETRY_TOTAL):
+                break
+            try:
+                delay = float(response.headers.get("Retry-After"))
+            except (TypeError, ValueError):
+                delay = self._RETRY_BACKOFF * (2 ** attempt)
+            logger.info(f"⏳ Retrying {method} after HTTP {response.status_code} "
+                        f"(attempt {attempt + 1}/{self._RETRY_TOTAL}, {delay:.0f}s)")
+            time.sleep(delay)
+        self._respect_rate_limit(response.headers)
+        return response
+
+    def _respect_rate_limit(self, headers) -> None:
+        """
+        Pause when the rate-limit quota is nearly exhausted.
+
+        With only a handful of requests left, the parallel tree-item
+        builders would burn the remainder instantly and then spend
+        longer in 403 retries than simply waiting for the reset.
+
+        Args:
+            headers: Response headers from the last request
+        """
+        try:
+            remaining = int(headers.get("X-RateLimit-Remaining"))
+            reset = float(headers.get("X-RateLimit-Reset"))
+        except (TypeError, ValueError):
+            return
+
+        if remaining >= 10:
+            return
+
+        wait = reset - time.time() + 1.0
+        if wait > 0:
+            logger.info(f"⏳ Rate limit low ({remaining} left); waiting {wait:.0f}s for reset")
+            time.sleep(wait)
+
+    def _graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        POST a GraphQL query and return its data payload.
+
+        Raises on transport errors and on GraphQL-level errors so
+        callers can fall back to the REST endpoints.
+
+        Args:
+            query: GraphQL query or mutation text
+            variables: Query variables
+
+        Returns:
+            The "data" object from the response
+        """
+        response = self._request("POST", f"{self.api_base}/graphql", json={
+            "query": query,
+            "variables": variables,
+        })
+        response.raise_for_status()
+        payload = _loads(response.content)
+        if payload.get("errors"):
+            raise RuntimeError(payload["errors"][0].get("message", "GraphQL error"))
+        return payload["data"]
+
+    @staticmethod
+    def _extract_error(e: Exception) -> str:
+        """
+        Pull a readable message out of an HTTP error.
+
+        Prefers the API's "message" field, parsing the raw response
+        bytes directly instead of materializing the full error payload
+        via .json(); falls back to the response text, then to str(e).
+
+        Args:
+            e: Exception raised by the HTTP client
+
+        Returns:
+            Human-readable error message
+        """
+        response = getattr(e, 'response', None)
+        if response is None:
+            return str(e)
+        try:
+            message = _loads(response.content).get('message')
+        except Exception:
+            message = None
+        return message or response.text or str(e)
+
+    def close(self) -> None:
+        """Close the underlying HTTP clients."""
+        if self._client is not None:
+            self._client.close()
+        self.session.close()
+
+    def __enter__(self) -> "PRCreator":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
     def create_pr(
         self,
         fixes: List[Dict[str, Any]],
@@ -51,44 +487,53 @@ class PRCreator:
         Returns:
             PR details dict with success status, pr_url, branch, etc.
         """
-        print(f"🔧 Creating PR for issue #{issue_number}")
-        print(f"   Branch: {branch_name}")
-        print(f"   Fixes: {len(fixes)}")
-        print(f"   Confidence: {confidence:.0%}")
+        logger.info(f"🔧 Creating PR for issue #{issue_number}")
+        logger.info(f"   Branch: {branch_name}")
+        logger.info(f"   Fixes: {len(fixes)}")
+        logger.info(f"   Confidence: {confidence:.0%}")
 
-        # Create PR title and body
-        title = self._format_pr_title(issue_number, fixes)
-        body = self._format_pr_body(fixes, issue_number, confidence)
+        # Walk the fix list once; the formatters share the aggregates
+        summary = _summarize(fixes)
+        title = self._format_pr_title(issue_number, summary)
+        body = self._format_pr_body(fixes, issue_number, confidence, summary)
 
         # Determine if should be draft
         is_draft = draft or confidence < 0.90
         if is_draft:
-            print(f"   Creating as DRAFT PR (confidence < 90%)")
+            reason = "requested" if draft else "confidence < 90%"
+            logger.info(f"   Creating as DRAFT PR ({reason})")
 
-        try:
-            print(f"🚀 Creating PR via GitHub API...")
+        labels = ["automated-fix", "needs-review"]
 
-            # Create PR
-            url = f"{self.api_base}/repos/{self.owner}/{self.repo}/pulls"
-            payload = {
-                "title": title,
-                "body": body,
-                "head": branch_name,
-                "base": base_branch,
-                "draft": is_draft,
-            }
-
-            response = requests.post(url, headers=self.headers, json=payload)
-            response.raise_for_status()
+        try:
+            logger.info(f"🚀 Creating PR via GitHub API...")
+
+            try:
+                # GraphQL path: the mutation response carries only the
+                # fields we ask for, and the cached label node IDs make
+                # the labeling call a tiny mutation as well
+                pr_url, pr_number = self._create_pr_graphql(
+                    title, body, branch_name, base_branch, is_draft, labels,
+                )
+                logger.info(f"✅ PR created: {pr_url}")
+            except Exception:
+                # REST fallback: create the PR, then label it
+                url = f"{self.api_base}/repos/{self.owner}/{self.repo}/pulls"
+                payload = {
+                    "title": title,
+                    "body": body,
+                    "head": branch_name,
+                    "base": base_branch,
+                    "draft": is_draft,
+                }
 
-            pr_data = response.json()
-            pr_url = pr_data["html_url"]
-            pr_number = pr_data["number"]
+                pr_data = self._post_json(url, payload, ("html_url", "number"))
+                pr_url = pr_data["html_url"]
+                pr_number = pr_data["number"]
 
-            print(f"✅ PR created: {pr_url}")
+                logger.info(f"✅ PR created: {pr_url}")
 
-            # Add labels
-            self._add_labels_to_pr(pr_number, ["automated-fix", "needs-review"])
+                self._add_labels_to_pr(pr_number, labels)
 
             return {
                 "success": True,
@@ -101,16 +546,9 @@ class PRCreator:
                 "is_draft": is_draft,
             }
 
-        except requests.exceptions.RequestException as e:
-            error_msg = str(e)
-            if hasattr(e, 'response') and e.response is not None:
-                try:
-                    error_data = e.response.json()
-                    error_msg = error_data.get('message', error_msg)
-                except:
-                    error_msg = e.response.text or error_msg
-
-            print(f"❌ Failed to create PR: {error_msg}")
+        except _HTTP_ERRORS as e:
+            error_msg = self._extract_error(e)
+            logger.info(f"❌ Failed to create PR: {error_msg}")
 
             return {
                 "success": False,
@@ -137,15 +575,13 @@ class PRCreator:
             Dict with success status and details
         """
         try:
-            print(f"🌿 Creating branch: {branch_name}")
+            logger.info(f"🌿 Creating branch: {branch_name}")
 
-            # Get the base branch SHA
-            ref_url = f"{self.api_base}/repos/{self.owner}/{self.repo}/git/refs/heads/{base_branch}"
-            response = requests.get(ref_url, headers=self.headers)
-            response.raise_for_status()
-            base_sha = response.json()["object"]["sha"]
+            # Get the base branch commit and tree SHAs (one round-trip
+            # via GraphQL when available)
+            base_sha, base_tree_sha = self._fetch_base_refs(base_branch)
 
-            print(f"   Base SHA: {base_sha[:7]}")
+            logger.info(f"   Base SHA: {base_sha[:7]}")
 
             # Create new branch reference
             create_ref_url = f"{self.api_base}/repos/{self.owner}/{self.repo}/git/refs"
@@ -153,16 +589,10 @@ class PRCreator:
                 "ref": f"refs/heads/{branch_name}",
                 "sha": base_sha,
             }
-            response = requests.post(create_ref_url, headers=self.headers, json=payload)
+            response = self._request("POST", create_ref_url, json=payload)
             response.raise_for_status()
 
-            print(f"✅ Branch created")
-
-            # Get the base tree
-            commit_url = f"{self.api_base}/repos/{self.owner}/{self.repo}/git/commits/{base_sha}"
-            response = requests.get(commit_url, headers=self.headers)
-            response.raise_for_status()
-            base_tree_sha = response.json()["tree"]["sha"]
+            logger.info(f"✅ Branch created")
 
             # Group fixes by file path
             fixes_by_file = {}
@@ -173,105 +603,54 @@ class PRCreator:
                         fixes_by_file[file_path] = []
                     fixes_by_file[file_path].append(fix)
 
-            print(f"   Processing {len(fixes_by_file)} unique file(s)")
-
-            # Create blobs for each unique file
-            tree_items = []
-            for file_path, file_fixes in fixes_by_file.items():
-                print(f"   Applying {len(file_fixes)} fix(es) to {file_path}")
-
-                # Fetch original file content from base branch
-                file_url = f"{self.api_base}/repos/{self.owner}/{self.repo}/contents/{file_path}"
-                params = {"ref": base_branch}
-                response = requests.get(file_url, headers=self.headers, params=params)
-                response.raise_for_status()
-
-                file_data = response.json()
-                original_content = base64.b64decode(file_data["content"]).decode("utf-8")
-                original_lines = original_content.splitlines(keepends=True)
-
-                # Sort fixes by line number (descending) to avoid offset issues
-                sorted_fixes = sorted(file_fixes, key=lambda f: f.get("line_number", 0), reverse=True)
-
-                # Apply each fix
-                modified_lines = original_lines.copy()
-                for fix in sorted_fixes:
-                    line_number = fix.get("line_number")
-                    fixed_code = fix.get("fix")
-
-                    if line_number and fixed_code:
-                        # Convert to 0-based index
-                        line_index = line_number - 1
-
-                        if 0 <= line_index < len(modified_lines):
-                            # Replace the line with the fixed code
-                            # Preserve newline if original had one
-                            if not fixed_code.endswith('\n') and modified_lines[line_index].endswith('\n'):
-                                fixed_code += '\n'
-                            modified_lines[line_index] = fixed_code
-                            print(f"      Applied fix at line {line_number}")
-                        else:
-                            print(f"      ⚠️  Line {line_number} out of range (file has {len(modified_lines)} lines)")
-
-                # Join modified lines back into file content
-                fixed_content = "".join(modified_lines)
-
-                # Create blob for the fixed file
-                blob_url = f"{self.api_base}/repos/{self.owner}/{self.repo}/git/blobs"
-                blob_payload = {
-                    "content": fixed_content,
-                    "encoding": "utf-8",
-                }
-                response = requests.post(blob_url, headers=self.headers, json=blob_payload)
-                response.raise_for_status()
-                blob_sha = response.json()["sha"]
-
-                # Add to tree
-                tree_items.append({
-                    "path": file_path,
-                    "mode": "100644",  # Regular file
-                    "type": "blob",
-                    "sha": blob_sha,
-                })
-
-                print(f"   ✅ Created blob for {file_path}")
-
-            # Create new tree
-            print(f"   Creating tree with {len(tree_items)} file(s)")
-            tree_url = f"{self.api_base}/repos/{self.owner}/{self.repo}/git/trees"
-            tree_payload = {
-                "base_tree": base_tree_sha,
-                "tree": tree_items,
-            }
-            response = requests.post(tree_url, headers=self.headers, json=tree_payload)
-            response.raise_for_status()
-            new_tree_sha = response.json()["sha"]
-
-            # Create commit
-            commit_message = self._format_commit_message(fixes)
-            print(f"💾 Creating commit...")
+            logger.info(f"   Processing {len(fixes_by_file)} unique file(s)")
 
-            commit_url = f"{self.api_base}/repos/{self.owner}/{self.repo}/git/commits"
-            commit_payload = {
-                "message": commit_message,
-                "tree": new_tree_sha,
-                "parents": [base_sha],
-            }
-            response = requests.post(commit_url, headers=self.headers, json=commit_payload)
-            response.raise_for_status()
-            new_commit_sha = response.json()["sha"]
-
-            # Update branch reference to point to new commit
-            print(f"📤 Updating branch reference...")
-            update_ref_url = f"{self.api_base}/repos/{self.owner}/{self.repo}/git/refs/heads/{branch_name}"
-            update_payload = {
-                "sha": new_commit_sha,
-                "force": False,
-            }
-            response = requests.patch(update_ref_url, headers=self.headers, json=update_payload)
-            response.raise_for_status()
+            # Apply fixes to each file concurrently: the per-file fetch
+            # is an independent round-trip, so a small thread pool
+            # collapses N serial RTTs into ~N/workers. The session's
+            # keep-alive pool provides the sockets. ex.map preserves
+            # input order so the resulting entries stay deterministic.
+            errors: List[tuple] = []
 
-            print(f"✅ Branch created and committed")
+            def _safe_apply(item):
+                file_path, file_fixes = item
+                try:
+                    return (
+                        file_path,
+                        self._apply_fixes_to_file(file_path, file_fixes, base_branch),
+                    )
+                except Exception as exc:
+                    errors.append((file_path, exc))
+                    return None
+
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                file_contents = [
+                    item for item in executor.map(_safe_apply, fixes_by_file.items())
+                    if item
+                ]
+
+            if errors:
+                # Surface the first failure; the others' fetches are
+                # already done so nothing is wasted on retry
+                raise errors[0][1]
+
+            commit_message = self._format_commit_message(fixes, _summarize(fixes))
+            logger.info(f"💾 Creating commit...")
+
+            try:
+                # createCommitOnBranch builds the tree server-side and
+                # advances the ref atomically — one round-trip instead
+                # of the tree POST + commit POST + ref PATCH below
+                new_commit_sha = self._create_commit_graphql(
+                    branch_name, base_sha, commit_message, file_contents,
+                )
+            except Exception:
+                new_commit_sha = self._commit_via_rest(
+                    branch_name, base_sha, base_tree_sha,
+                    commit_message, file_contents,
+                )
+
+            logger.info(f"✅ Branch created and committed")
 
             return {
                 "success": True,
@@ -280,16 +659,9 @@ class PRCreator:
                 "files_modified": len(fixes),
             }
 
-        except requests.exceptions.RequestException as e:
-            error_msg = str(e)
-            if hasattr(e, 'response') and e.response is not None:
-                try:
-                    error_data = e.response.json()
-                    error_msg = error_data.get('message', error_msg)
-                except:
-                    error_msg = e.response.text or error_msg
-
-            print(f"❌ Failed to create branch: {error_msg}")
+        except _HTTP_ERRORS as e:
+            error_msg = self._extract_error(e)
+            logger.info(f"❌ Failed to create branch: {error_msg}")
 
             return {
                 "success": False,
@@ -297,6 +669,289 @@ class PRCreator:
                 "branch": branch_name,
             }
 
+    def _post_json(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        keys: tuple,
+    ) -> Dict[str, Any]:
+        """
+        POST a payload and pluck only the named keys from the response.
+
+        Created PRs/commits/trees come back as 5-50KB of nested metadata
+        of which callers need one or two fields; parsing the raw bytes
+        (orjson when installed) and extracting immediately keeps the
+        throwaway structure short-lived.
+
+        Args:
+            url: Endpoint URL
+            payload: JSON body to send
+            keys: Response keys to return
+
+        Returns:
+            Dict containing just the requested keys
+        """
+        response = self._request("POST", url, json=payload)
+        response.raise_for_status()
+        data = _loads(response.content)
+        return {k: data[k] for k in keys}
+
+    def _fetch_base_refs(self, base_branch: str) -> tuple:
+        """
+        Resolve the base branch's commit SHA and tree SHA.
+
+        Tries a single GraphQL query first, which returns both values in
+        one round-trip; falls back to the two sequential REST lookups
+        when GraphQL is unavailable for the token.
+
+        Args:
+            base_branch: Branch name to resolve
+
+        Returns:
+            Tuple of (base_sha, base_tree_sha)
+        """
+        cached = self._base_cache.get(base_branch)
+        if cached is not None and time.monotonic() - cached[2] < self._BASE_CACHE_TTL:
+            return cached[0], cached[1]
+
+        query = (
+            "query($owner: String!, $name: String!, $ref: String!) { "
+            "repository(owner: $owner, name: $name) { "
+            "ref(qualifiedName: $ref) { "
+            "target { ... on Commit { oid tree { oid } } } } } }"
+        )
+        try:
+            data = self._graphql(query, {
+                "owner": self.owner,
+                "name": self.repo,
+                "ref": f"refs/heads/{base_branch}",
+            })
+            target = data["repository"]["ref"]["target"]
+            refs = (target["oid"], target["tree"]["oid"])
+            self._base_cache[base_branch] = refs + (time.monotonic(),)
+            return refs
+        except Exception:
+            pass
+
+        # REST fallback: ref lookup, then commit lookup for its tree
+        ref_url = f"{self.api_base}/repos/{self.owner}/{self.repo}/git/refs/heads/{base_branch}"
+        response = self._request("GET", ref_url)
+        response.raise_for_status()
+        base_sha = response.json()["object"]["sha"]
+
+        commit_url = f"{self.api_base}/repos/{self.owner}/{self.repo}/git/commits/{base_sha}"
+        response = self._request("GET", commit_url)
+        response.raise_for_status()
+        base_tree_sha = response.json()["tree"]["sha"]
+        self._base_cache[base_branch] = (base_sha, base_tree_sha, time.monotonic())
+        return base_sha, base_tree_sha
+
+    def _apply_fixes_to_file(
+        self,
+        file_path: str,
+        file_fixes: List[Dict[str, Any]],
+        base_branch: str,
+    ) -> str:
+        """
+        Fetch a file from the base branch and apply its fixes.
+
+        Args:
+            file_path: Path of the file in the repository
+            file_fixes: Fixes targeting this file
+            base_branch: Branch to fetch the original content from
+
+        Returns:
+            The fixed file content
+        """
+        logger.info(f"   Applying {len(file_fixes)} fix(es) to {file_path}")
+
+        # Fetch original file content from base branch
+        file_url = f"{self.api_base}/repos/{self.owner}/{self.repo}/contents/{file_path}"
+        params = {"ref": base_branch}
+        response = self._request("GET", file_url, params=params)
+        response.raise_for_status()
+
+        file_data = response.json()
+        original_content = base64.b64decode(file_data["content"]).decode("utf-8")
+        original_lines = original_content.splitlines(keepends=True)
+
+        # Sort fixes by line number (descending) to avoid offset issues
+        sorted_fixes = sorted(file_fixes, key=lambda f: f.get("line_number", 0), reverse=True)
+
+        # Apply each fix
+        modified_lines = original_lines.copy()
+        for fix in sorted_fixes:
+            line_number = fix.get("line_number")
+            fixed_code = fix.get("fix")
+
+            if line_number and fixed_code:
+                # Convert to 0-based index
+                line_index = line_number - 1
+
+                if 0 <= line_index < len(modified_lines):
+                    # Replace the line with the fixed code
+                    # Preserve newline if original had one
+                    if not fixed_code.endswith('\n') and modified_lines[line_index].endswith('\n'):
+                        fixed_code += '\n'
+                    modified_lines[line_index] = fixed_code
+                    logger.info(f"      Applied fix at line {line_number}")
+                else:
+                    logger.info(f"      ⚠️  Line {line_number} out of range (file has {len(modified_lines)} lines)")
+
+        # Join modified lines back into file content
+        return "".join(modified_lines)
+
+    def _build_tree_item(self, file_path: str, fixed_content: str) -> Dict[str, Any]:
+        """
+        Turn fixed file content into a git-tree entry.
+
+        Args:
+            file_path: Path of the file in the repository
+            fixed_content: The file content after fixes
+
+        Returns:
+            Tree entry dict (inline content, or a blob reference)
+        """
+        # The create-tree endpoint accepts content inline, letting the
+        # server create the blob in the same request — no per-file blob
+        # POST. GitHub rejects inline content around 1MB, so oversized
+        # files still go through an explicit blob upload.
+        if len(fixed_content.encode("utf-8")) <= 1_000_000:
+            logger.info(f"   ✅ Prepared inline content for {file_path}")
+            return {
+                "path": file_path,
+                "mode": "100644",  # Regular file
+                "type": "blob",
+                "content": fixed_content,
+            }
+
+        # base64 avoids JSON-escaping every quote and newline in the
+        # code; for a file this size the escaped UTF-8 body would be
+        # larger on the wire than the base64 form
+        blob_url = f"{self.api_base}/repos/{self.owner}/{self.repo}/git/blobs"
+        blob_payload = {
+            "content": base64.b64encode(fixed_content.encode("utf-8")).decode("ascii"),
+            "encoding": "base64",
+        }
+        blob_sha = self._post_json(blob_url, blob_payload, ("sha",))["sha"]
+
+        logger.info(f"   ✅ Created blob for {file_path}")
+
+        return {
+            "path": file_path,
+            "mode": "100644",  # Regular file
+            "type": "blob",
+            "sha": blob_sha,
+        }
+
+    def _create_commit_graphql(
+        self,
+        branch_name: str,
+        expected_head_oid: str,
+        message: str,
+        file_contents: List[tuple],
+    ) -> str:
+        """
+        Commit file changes with a single createCommitOnBranch mutation.
+
+        The server builds the tree and fast-forwards the branch in one
+        atomic call, guarded by expectedHeadOid against concurrent
+        pushes.
+
+        Args:
+            branch_name: Branch to commit to (must already exist)
+            expected_head_oid: Current head SHA of the branch
+            message: Full commit message
+            file_contents: List of (file_path, fixed_content) pairs
+
+        Returns:
+            SHA of the created commit
+        """
+        headline, _, body = message.partition("\n")
+        commit_message: Dict[str, str] = {"headline": headline}
+        body = body.lstrip("\n")
+        if body:
+            commit_message["body"] = body
+
+        mutation = (
+            "mutation($input: CreateCommitOnBranchInput!) { "
+            "createCommitOnBranch(input: $input) { commit { oid } } }"
+        )
+        data = self._graphql(mutation, {"input": {
+            "branch": {
+                "repositoryNameWithOwner": self.repository,
+                "branchName": branch_name,
+            },
+            "expectedHeadOid": expected_head_oid,
+            "message": commit_message,
+            "fileChanges": {
+                "additions": [
+                    {
+                        "path": path,
+                        "contents": base64.b64encode(
+                            content.encode("utf-8")
+                        ).decode("ascii"),
+                    }
+                    for path, content in file_contents
+                ],
+            },
+        }})
+        return data["createCommitOnBranch"]["commit"]["oid"]
+
+    def _commit_via_rest(
+        self,
+        branch_name: str,
+        base_sha: str,
+        base_tree_sha: str,
+        message: str,
+        file_contents: List[tuple],
+    ) -> str:
+        """
+        REST fallback: create a tree, a commit, and update the branch.
+
+        Args:
+            branch_name: Branch to point at the new commit
+            base_sha: Parent commit SHA
+            base_tree_sha: Tree SHA the new tree extends
+            message: Full commit message
+            file_contents: List of (file_path, fixed_content) pairs
+
+        Returns:
+            SHA of the created commit
+        """
+        tree_items = [
+            self._build_tree_item(path, content)
+            for path, content in file_contents
+        ]
+
+        logger.info(f"   Creating tree with {len(tree_items)} file(s)")
+        tree_url = f"{self.api_base}/repos/{self.owner}/{self.repo}/git/trees"
+        tree_payload = {
+            "base_tree": base_tree_sha,
+            "tree": tree_items,
+        }
+        new_tree_sha = self._post_json(tree_url, tree_payload, ("sha",))["sha"]
+
+        commit_url = f"{self.api_base}/repos/{self.owner}/{self.repo}/git/commits"
+        commit_payload = {
+            "message": message,
+            "tree": new_tree_sha,
+            "parents": [base_sha],
+        }
+        new_commit_sha = self._post_json(commit_url, commit_payload, ("sha",))["sha"]
+
+        # Update branch reference to point to new commit
+        logger.info(f"📤 Updating branch reference...")
+        update_ref_url = f"{self.api_base}/repos/{self.owner}/{self.repo}/git/refs/heads/{branch_name}"
+        update_payload = {
+            "sha": new_commit_sha,
+            "force": False,
+        }
+        response = self._request("PATCH", update_ref_url, json=update_payload)
+        response.raise_for_status()
+
+        return new_commit_sha
+
     def add_comment_to_issue(
         self,
         issue_number: int,
@@ -319,31 +974,123 @@ class PRCreator:
         comment = self._format_issue_comment(fixes, confidence)
 
         try:
-            print(f"💬 Adding comment to issue #{issue_number}")
+            logger.info(f"💬 Adding comment to issue #{issue_number}")
 
             url = f"{self.api_base}/repos/{self.owner}/{self.repo}/issues/{issue_number}/comments"
             payload = {
                 "body": comment,
             }
 
-            response = requests.post(url, headers=self.headers, json=payload)
+            response = self._request("POST", url, json=payload)
             response.raise_for_status()
 
-            print(f"✅ Comment added")
+            logger.info(f"✅ Comment added")
             return True
 
-        except requests.exceptions.RequestException as e:
-            error_msg = str(e)
-            if hasattr(e, 'response') and e.response is not None:
-                try:
-                    error_data = e.response.json()
-                    error_msg = error_data.get('message', error_msg)
-                except:
-                    pass
-
-            print(f"❌ Failed to add comment: {error_msg}")
+        except _HTTP_ERRORS as e:
+            logger.info(f"❌ Failed to add comment: {self._extract_error(e)}")
             return False
 
+    def _create_pr_graphql(
+        self,
+        title: str,
+        body: str,
+        branch_name: str,
+        base_branch: str,
+        is_draft: bool,
+        labels: List[str],
+    ) -> tuple:
+        """
+        Create a PR (and label it) through the GraphQL API.
+
+        createPullRequest does not accept label IDs directly, so labels
+        go through a follow-up addLabelsToLabelable mutation — the same
+        call count as REST, but both responses carry only the requested
+        fields instead of full PR/label payloads, and the label node
+        IDs come from the per-creator cache after the first PR.
+
+        Args:
+            title: PR title
+            body: PR body (markdown)
+            branch_name: Head branch
+            base_branch: Base branch
+            is_draft: Whether to open as a draft
+            labels: Label names to apply
+
+        Returns:
+            Tuple of (pr_url, pr_number)
+        """
+        label_ids = self._ensure_label_ids(labels)
+
+        mutation = (
+            "mutation($input: CreatePullRequestInput!) { "
+            "createPullRequest(input: $input) { "
+            "pullRequest { id url number } } }"
+        )
+        data = self._graphql(mutation, {"input": {
+            "repositoryId": self._repo_node_id,
+            "baseRefName": base_branch,
+            "headRefName": branch_name,
+            "title": title,
+            "body": body,
+            "draft": is_draft,
+        }})
+        pr = data["createPullRequest"]["pullRequest"]
+
+        if label_ids:
+            label_mutation = (
+                "mutation($input: AddLabelsToLabelableInput!) { "
+                "addLabelsToLabelable(input: $input) { clientMutationId } }"
+            )
+            try:
+                self._graphql(label_mutation, {"input": {
+                    "labelableId": pr["id"],
+                    "labelIds": label_ids,
+                }})
+                logger.info(f"   Added labels: {', '.join(labels)}")
+            except Exception as e:
+                logger.info(f"⚠️  Failed to add labels (non-critical): {e}")
+
+        return pr["url"], pr["number"]
+
+    def _ensure_label_ids(self, labels: List[str]) -> List[str]:
+        """
+        Resolve and cache the repository and label node IDs.
+
+        One aliased query fetches the repository ID plus every
+        not-yet-cached label in a single round-trip; subsequent PRs hit
+        the cache only.
+
+        Args:
+            labels: Label names to resolve
+
+        Returns:
+            Node IDs for the labels that exist in the repository
+        """
+        missing = [name for name in labels if name not in self._label_ids]
+        if self._repo_node_id is None or missing:
+            decls = ["$owner: String!", "$name: String!"]
+            aliases = []
+            variables: Dict[str, Any] = {"owner": self.owner, "name": self.repo}
+            for idx, name in enumerate(missing):
+                var = f"l{idx}"
+                decls.append(f"${var}: String!")
+                aliases.append(f"{var}: label(name: ${var}) {{ id }}")
+                variables[var] = name
+            query = (
+                f"query({', '.join(decls)}) {{ "
+                f"repository(owner: $owner, name: $name) {{ "
+                f"id {' '.join(aliases)} }} }}"
+            )
+            repo_data = self._graphql(query, variables)["repository"]
+            self._repo_node_id = repo_data["id"]
+            for idx, name in enumerate(missing):
+                node = repo_data.get(f"l{idx}")
+                if node:
+                    self._label_ids[name] = node["id"]
+
+        return [self._label_ids[name] for name in labels if name in self._label_ids]
+
     def _add_labels_to_pr(self, pr_number: int, labels: List[str]) -> bool:
         """
         Add labels to a PR.
@@ -361,38 +1108,33 @@ class PRCreator:
                 "labels": labels,
             }
 
-            response = requests.post(url, headers=self.headers, json=payload)
+            response = self._request("POST", url, json=payload)
             response.raise_for_status()
 
-            print(f"   Added labels: {', '.join(labels)}")
+            logger.info(f"   Added labels: {', '.join(labels)}")
             return True
 
-        except requests.exceptions.RequestException as e:
-            print(f"⚠️  Failed to add labels (non-critical): {e}")
+        except _HTTP_ERRORS as e:
+            logger.info(f"⚠️  Failed to add labels (non-critical): {e}")
             return False
 
-    def _format_pr_title(self, issue_number: int, fixes: List[Dict[str, Any]]) -> str:
+    def _format_pr_title(self, issue_number: int, summary: _FixSummary) -> str:
         """
         Format PR title.
 
         Args:
             issue_number: Issue number
-            fixes: List of fixes
+            summary: Aggregates for the fix batch
 
         Returns:
             PR title string
         """
-        # Get primary pattern
-        patterns = [f.get("pattern", "unknown") for f in fixes]
-        primary_pattern = patterns[0] if patterns else "unknown"
-
-        # Count unique patterns
-        unique_patterns = len(set(patterns))
+        primary_pattern = summary.patterns[0] if summary.patterns else "unknown"
 
-        if unique_patterns == 1:
-            pattern_desc = primary_pattern.replace("_", " ").title()
+        if summary.unique == 1:
+            pattern_desc = _pattern_title(primary_pattern)
         else:
-            pattern_desc = f"{unique_patterns} issues"
+            pattern_desc = f"{summary.unique} issues"
 
         return f"🤖 Auto-fix: {pattern_desc} (Issue #{issue_number})"
 
@@ -401,6 +1143,7 @@ class PRCreator:
         fixes: List[Dict[str, Any]],
         issue_number: int,
         confidence: float,
+        summary: _FixSummary,
     ) -> str:
         """
         Format PR description.
@@ -409,146 +1152,93 @@ class PRCreator:
             fixes: List of fix dicts
             issue_number: Issue number
             confidence: Overall confidence score
+            summary: Aggregates for the fix batch
 
         Returns:
             Formatted PR body (markdown)
         """
-        lines = [
-            f"# 🤖 Automated Fix",
-            "",
-            f"Fixes #{issue_number}",
-            "",
-            "## Summary",
-            "",
-            f"This PR contains **{len(fixes)} automated fix(es)** for test failures.",
-            "",
-            f"**Overall Confidence**: {confidence:.0%}",
-            "",
-        ]
-
-        # Add quick stats
-        patterns = [f.get("pattern", "unknown") for f in fixes]
-        pattern_counts = {}
-        for p in patterns:
-            pattern_counts[p] = pattern_counts.get(p, 0) + 1
-
-        lines.append("**Patterns Fixed**:")
-        for pattern, count in pattern_counts.items():
-            pattern_name = pattern.replace("_", " ").title()
-            lines.append(f"- {pattern_name}: {count}")
-        lines.append("")
-
-        # Add changes section
-        lines.append("## Changes Made")
-        lines.append("")
-
+        # Degenerate case: a status-report call with nothing generated
+        if not fixes:
+            return (
+                f"# 🤖 Automated Fix\n\nFixes #{issue_number}\n\n"
+                "No fixes were generated for this issue."
+            )
+
+        # Quick stats
+        pattern_lines = "\n".join(
+            f"- {_pattern_title(pattern)}: {count}"
+            for pattern, count in summary.counts.items()
+        )
+
+        # Bind fix.get once per fix: the block render makes seven
+        # lookups, and the bound method skips the attribute fetch each
+        # time. The `or` guard also maps empty/None fix code to the
+        # placeholder rather than slicing it.
+        fix_blocks = []
         for i, fix in enumerate(fixes, 1):
-            test_passed = "✅ Passed" if fix.get("test_passed") else "⚠️ Not verified"
-
-            lines.extend([
-                f"### {i}. {fix.get('test_name', 'Unknown test')}",
-                "",
-                f"**File**: `{fix.get('file', 'unknown')}`",
-                f"**Pattern**: `{fix.get('pattern', 'unknown')}`",
-                f"**Confidence**: {fix.get('final_confidence', 0):.0%}",
-                f"**Test Result**: {test_passed}",
-                "",
-                "**Explanation**:",
-                fix.get('explanation', 'No explanation provided'),
-                "",
-                "<details>",
-                "<summary>View fix code</summary>",
-                "",
-                "```javascript",
-                fix.get('fix', '// No fix code')[:500],  # Truncate long fixes
-                "```",
-                "</details>",
-                "",
-                "---",
-                "",
-            ])
-
-        # Add testing section
-        lines.extend([
-            "## Testing",
-            "",
-            "- [x] Fixes generated by AI",
-            "- [x] Fixes tested in isolated containers",
-        ])
-
-        # Add pass/fail info
-        passed_tests = sum(1 for f in fixes if f.get("test_passed"))
+            get = fix.get
+            fix_blocks.append(f"### {i}. " + _render_fix_block(
+                get('test_name', 'Unknown test'),
+                get('file', 'unknown'),
+                get('pattern', 'unknown'),
+                get('final_confidence', 0),
+                "✅ Passed" if get("test_passed") else "⚠️ Not verified",
+                get('explanation', 'No explanation provided'),
+                (get('fix') or '// No fix code')[:500],  # Truncate long fixes
+            ))
+
+        # Pass/fail checklist line
+        passed_tests = summary.passed
         if passed_tests == len(fixes):
-            lines.append("- [x] All fixes passed tests in containers ✅")
+            tested_line = "- [x] All fixes passed tests in containers ✅"
         elif passed_tests > 0:
-            lines.append(f"- [x] {passed_tests}/{len(fixes)} fixes passed tests")
+            tested_line = f"- [x] {passed_tests}/{len(fixes)} fixes passed tests"
         else:
-            lines.append("- [ ] Fixes need manual testing")
-
-        lines.extend([
-            "- [ ] Manual review completed",
-            "- [ ] Full test suite verified",
-            "",
-        ])
-
-        # Add important notice
-        lines.extend([
-            "## ⚠️ Important",
-            "",
-            "This is an **automated fix** generated by AI. Please:",
-            "",
-            "1. ✅ **Review the changes carefully** - AI can make mistakes",
-            "2. 🧪 **Run the full test suite locally** - Container tests are isolated",
-            "3. 🔍 **Verify no regressions** - Check related functionality",
-            "4. 🎯 **Test edge cases** - Automated tests may not cover everything",
-            "",
-            f"💬 Questions? Comment on issue #{issue_number}",
-            "",
-            "---",
-            "",
-            f"🤖 Generated by [Playwright Auto-Fixer](https://github.com/{self.repository})",
-            f"⏰ {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}",
-        ])
-
-        return "\n".join(lines)
-
-    def _format_commit_message(self, fixes: List[Dict[str, Any]]) -> str:
+            tested_line = "- [ ] Fixes need manual testing"
+
+        return _PR_BODY_TMPL.format(
+            issue_number=issue_number,
+            fix_count=len(fixes),
+            confidence=confidence,
+            pattern_lines=pattern_lines,
+            fix_blocks="\n".join(fix_blocks),
+            tested_line=tested_line,
+            repository=self.repository,
+            timestamp=time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime()),
+        )
+
+    def _format_commit_message(
+        self,
+        fixes: List[Dict[str, Any]],
+        summary: _FixSummary,
+    ) -> str:
         """
         Format commit message.
 
         Args:
             fixes: List of fix dicts
+            summary: Aggregates for the fix batch
 
         Returns:
             Commit message
         """
-        patterns = [f.get("pattern", "unknown") for f in fixes]
-        primary_pattern = patterns[0] if patterns else "unknown"
-
-        # Format pattern name
-        pattern_desc = primary_pattern.replace("_", " ")
+        if not fixes:
+            return "fix: no automated fixes generated"
 
-        lines = [
-            f"fix: auto-fix {pattern_desc} ({len(fixes)} file(s))",
-            "",
-            "Automated fixes generated by Playwright Auto-Fixer:",
-            "",
-        ]
+        primary_pattern = summary.patterns[0] if summary.patterns else "unknown"
 
-        for fix in fixes:
+        def _file_line(fix):
             # Extract just filename from path
             file_path = fix.get("file", "unknown")
             file_name = file_path.split('/')[-1] if '/' in file_path else file_path
             pattern = fix.get("pattern", "unknown").replace("_", " ")
-            lines.append(f"- {file_name}: {pattern}")
-
-        lines.extend([
-            "",
-            "🤖 Generated with AI",
-            "Co-Authored-By: Playwright Auto-Fixer <noreply@github.com>",
-        ])
+            return f"- {file_name}: {pattern}"
 
-        return "\n".join(lines)
+        return _COMMIT_MESSAGE_TMPL.format(
+            pattern_desc=primary_pattern.replace("_", " "),
+            fix_count=len(fixes),
+            file_lines="\n".join(_file_line(fix) for fix in fixes),
+        )
 
     def _format_issue_comment(
         self,
@@ -565,47 +1255,25 @@ class PRCreator:
         Returns:
             Comment body (markdown)
         """
-        lines = [
-            "## 🤖 Auto-Fix Suggestions",
-            "",
-            f"I analyzed the test failures and generated **{len(fixes)} potential fix(es)**.",
-            "",
-            f"**Confidence**: {confidence:.0%} (below threshold for automatic PR)",
-            "",
-            "### Suggested Fixes",
-            "",
-        ]
+        if not fixes:
+            return (
+                "## 🤖 Auto-Fix Suggestions\n\n"
+                "No fix suggestions could be generated for these failures."
+            )
 
+        fix_blocks = []
         for i, fix in enumerate(fixes, 1):
-            lines.extend([
-                f"#### {i}. {fix.get('test_name', 'Unknown')}",
-                "",
-                f"**Pattern**: `{fix.get('pattern', 'unknown')}`",
-                f"**Confidence**: {fix.get('final_confidence', 0):.0%}",
-                "",
-                f"**Explanation**: {fix.get('explanation', 'N/A')}",
-                "",
-                "<details>",
-                "<summary>View suggested fix</summary>",
-                "",
-                "```javascript",
-                fix.get('fix', '// No fix')[:300],
-                "```",
-                "</details>",
-                "",
-            ])
-
-        lines.extend([
-            "---",
-            "",
-            "⚠️ These fixes have **lower confidence** and should be reviewed carefully.",
-            "",
-            "To apply these fixes manually:",
-            "1. Review each suggestion",
-            "2. Test thoroughly",
-            "3. Adjust as needed",
-            "",
-            f"🤖 Generated by Playwright Auto-Fixer",
-        ])
-
-        return "\n".join(lines)
+            get = fix.get
+            fix_blocks.append(f"#### {i}. " + _render_comment_block(
+                get('test_name', 'Unknown'),
+                get('pattern', 'unknown'),
+                get('final_confidence', 0),
+                get('explanation', 'N/A'),
+                (get('fix') or '// No fix')[:300],
+            ))
+
+        return _ISSUE_COMMENT_TMPL.format(
+            fix_count=len(fixes),
+            confidence=confidence,
+            fix_blocks="\n".join(fix_blocks),
+        )
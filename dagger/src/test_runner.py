@@ -1,8 +1,10 @@
 """Test execution in isolated Dagger containers."""
 
+import asyncio
+
 import dagger
 from dagger import dag
-from typing import Dict, Any
+from typing import Dict, Any, List
 import json
 
 
@@ -18,6 +20,27 @@ class TestRunner:
         """
         self.playwright_version = playwright_version
         self.image = f"mcr.microsoft.com/playwright:{playwright_version}"
+        self._base_container = None
+
+    def _base(self) -> "dagger.Container":
+        """
+        Base Playwright container, built once per runner.
+
+        Mounts a persistent cache volume for the npm cache so repeated
+        npm ci runs across fix validations hit a warm cache instead of
+        re-downloading; Dagger's content-addressed layer cache then
+        reuses the npm ci layer itself whenever the repository contents
+        are unchanged. The browser binaries baked into the image at
+        /ms-playwright are left alone — mounting a volume there would
+        shadow them with an empty directory.
+        """
+        if self._base_container is None:
+            self._base_container = (
+                dag.container()
+                .from_(self.image)
+                .with_mounted_cache("/root/.npm", dag.cache_volume("npm-cache"))
+            )
+        return self._base_container
 
     async def run_test(
         self,
@@ -44,8 +67,7 @@ class TestRunner:
         try:
             # Create Playwright container with repository code
             container = (
-                dag.container()
-                .from_(self.image)
+                self._base()
                 .with_directory("/app", repo_dir)
                 .with_workdir("/app")
             )
@@ -61,20 +83,23 @@ class TestRunner:
                     contents=fixed_code
                 )
 
-            # Run the specific test with JSON reporter
-            result = await (
+            # Run the specific test with the JSON reporter writing to a
+            # file: the report never interleaves with npm/test noise on
+            # stdout, so parsing is one json.loads of the report itself
+            # Reading the report file forces the exec; no separate
+            # sync() round-trip needed
+            output = await (
                 container
+                .with_env_variable("PLAYWRIGHT_JSON_OUTPUT_NAME", "/tmp/pw.json")
                 .with_exec([
                     "npx", "playwright", "test",
                     test_file,
                     "--reporter=json"
                 ])
-                .sync()
+                .file("/tmp/pw.json")
+                .contents()
             )
 
-            # Get stdout (JSON output from Playwright)
-            output = await result.stdout()
-
             # Parse Playwright JSON output
             parsed_result = self._parse_test_output(output)
 
@@ -129,8 +154,7 @@ class TestRunner:
         """
         try:
             container = (
-                dag.container()
-                .from_(self.image)
+                self._base()
                 .with_directory("/app", repo_dir)
                 .with_workdir("/app")
                 .with_exec(["npm", "ci"])
@@ -142,19 +166,20 @@ class TestRunner:
                     contents=fixed_code
                 )
 
-            # Run with grep to target specific test
-            result = await (
+            # Run with grep to target specific test; report goes to a
+            # file for the same reason as run_test
+            output = await (
                 container
+                .with_env_variable("PLAYWRIGHT_JSON_OUTPUT_NAME", "/tmp/pw.json")
                 .with_exec([
                     "npx", "playwright", "test",
                     test_file,
                     "-g", test_name,
                     "--reporter=json"
                 ])
-                .sync()
+                .file("/tmp/pw.json")
+                .contents()
             )
-
-            output = await result.stdout()
             parsed_result = self._parse_test_output(output)
 
             return {
@@ -185,11 +210,29 @@ class TestRunner:
             Dict with parsed test statistics
         """
         try:
-            # Playwright JSON reporter outputs multiple JSON objects
-            # Try to find the last complete JSON object (summary)
-            lines = output.strip().split('\n')
+            # The stats summary is the last JSON object in the stream.
+            # Scan the tail for the final object start and parse that
+            # one slice — splitting a multi-MB reporter blob into a line
+            # list just to find its last object is all wasted allocation.
+            stripped = output.strip()
+            idx = stripped.rfind('\n{')
+            candidate = stripped[idx + 1:] if idx >= 0 else stripped
+            try:
+                data = json.loads(candidate)
+            except json.JSONDecodeError:
+                data = None
+
+            if data is not None and "stats" in data:
+                stats = data["stats"]
+                return {
+                    "passed": stats.get("unexpected", 0) == 0 and stats.get("expected", 0) > 0,
+                    "duration_ms": stats.get("duration", 0),
+                    "total_tests": stats.get("expected", 0) + stats.get("unexpected", 0),
+                }
 
-            for line in reversed(lines):
+            # Fallback for interleaved output: walk lines from the end
+            # until one parses as the summary
+            for line in reversed(stripped.split('\n')):
                 if line.strip().startswith('{'):
                     try:
                         data = json.loads(line)
@@ -220,6 +263,39 @@ class TestRunner:
                 "total_tests": 0,
             }
 
+    async def run_batch(
+        self,
+        jobs: List[Dict[str, Any]],
+        max_concurrency: int = 4,
+    ) -> List[Dict[str, Any]]:
+        """
+        Run several test jobs concurrently.
+
+        Test runs are I/O-bound (image pulls, npm, network), so running
+        them in parallel approaches a linear speedup up to the
+        concurrency cap; the semaphore keeps the host from being
+        oversubscribed while Dagger's engine schedules the containers.
+
+        Args:
+            jobs: List of dicts with run_test arguments: repo_dir,
+                test_file, and optionally fixed_code
+            max_concurrency: Maximum simultaneous test runs
+
+        Returns:
+            List of result dicts, in input order
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _bounded(job: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.run_test(
+                    job["repo_dir"],
+                    job["test_file"],
+                    job.get("fixed_code"),
+                )
+
+        return await asyncio.gather(*(_bounded(job) for job in jobs))
+
     async def validate_fix(
         self,
         repo_dir: dagger.Directory,